@@ -0,0 +1,110 @@
+import pandas as pd
+
+# 📌 큐브의 차원 (날짜 외)
+CUBE_DIMENSIONS = ["구분", "결제구분", "주문유형"]
+
+def build_daily_cube(df_paid):
+    """
+    결제완료 주문을 일 × 구분 × 결제구분 × 주문유형 단위로 미리 집계한 큐브를 만듭니다.
+    매출(합계금액 합계)과 건수(합계금액 개수) 컬럼을 가지며, 매출/월별 통계 페이지의 표와 차트는 모두 이 큐브에서 파생됩니다.
+    """
+    day = df_paid["주문일시"].dt.normalize().rename("날짜")
+    # 합계금액은 int32 로 저장되므로 합계는 64비트로 계산합니다.
+    amount = df_paid["합계금액"].astype("Int64")
+    cube = (
+        amount.groupby([day, *(df_paid[col] for col in CUBE_DIMENSIONS)], dropna=False, observed=True)
+        .agg(["sum", "count"])
+        .reset_index()
+        .rename(columns={"sum": "매출", "count": "건수"})
+    )
+    cube["연월"] = cube["날짜"].dt.to_period("M")
+    cube["연월_str"] = cube["연월"].astype(str)
+    return cube
+
+def daily_sales(cube):
+    """일별 매출 (날짜, 매출)"""
+    return cube.groupby("날짜")["매출"].sum().reset_index()
+
+def category_sales(cube):
+    """구분별 매출 (합계금액 Series)"""
+    return cube.groupby("구분", observed=True)["매출"].sum().rename("합계금액")
+
+def monthly_stats(cube):
+    """월 × 구분별 매출/건수 (연월, 구분, 매출, 건수, 연월_str)"""
+    stats = cube.groupby(["연월", "구분"], observed=True)[["매출", "건수"]].sum().reset_index()
+    stats["연월_str"] = stats["연월"].astype(str)
+    return stats
+
+def monthly_totals(cube):
+    """월별 총 금액 (연월, 총 금액)"""
+    return (
+        cube.groupby("연월_str")["매출"]
+        .sum()
+        .reset_index()
+        .rename(columns={"연월_str": "연월", "매출": "총 금액"})
+        .sort_values("연월")
+    )
+
+def monthly_pivot(cube, column):
+    """월 × column(구분/결제구분/주문유형)별 합계 금액 표"""
+    return (
+        cube.pivot_table(
+            index="연월_str",
+            columns=column,
+            values="매출",
+            aggfunc="sum",
+            fill_value=0,
+            observed=True,
+        )
+        .reset_index()
+        .rename(columns={"연월_str": "연월"})
+        .sort_values("연월")
+    )
+
+def merge_cubes(cubes):
+    """여러 큐브(예: 지점별 큐브)를 합쳐 같은 날짜·차원의 매출/건수를 더한 큐브를 만듭니다."""
+    keys = ["날짜", *CUBE_DIMENSIONS]
+    parts = [cube[keys + ["매출", "건수"]] for cube in cubes]
+    # 큐브마다 category 값 목록이 다를 수 있으므로 문자열로 합친 뒤 다시 묶습니다.
+    merged = pd.concat(parts, ignore_index=True).astype({col: "str" for col in CUBE_DIMENSIONS})
+    cube = (
+        merged.groupby(keys, dropna=False, sort=True)[["매출", "건수"]]
+        .sum()
+        .reset_index()
+        .astype({col: "category" for col in CUBE_DIMENSIONS})
+    )
+    cube["연월"] = cube["날짜"].dt.to_period("M")
+    cube["연월_str"] = cube["연월"].astype(str)
+    return cube
+
+def event_summary(df_paid):
+    """
+    이벤트 현황 페이지의 집계 (분류된 결제 로그 기준)
+    normal_sales: 정가 매출 합계 (정가 주문이 없으면 None), event_sales_detail: 이벤트명 × 상품 유형별 매출,
+    event_total_sales: 이벤트명별 매출
+    """
+    normal = df_paid["합계금액"][df_paid["상품 유형"] == "정가"]
+    event_df = df_paid[df_paid["이벤트명"].notnull()]
+    return {
+        "normal_sales": normal.sum() if len(normal) else None,
+        "event_sales_detail": event_df.groupby(["이벤트명", "상품 유형"], observed=True)["합계금액"].sum().reset_index(),
+        "event_total_sales": event_df.groupby("이벤트명", observed=True)["합계금액"].sum().reset_index(),
+    }
+
+def top_members(df_paid, n=10):
+    """총 결제 금액 상위 n 명 (이름, 합계금액)"""
+    return df_paid.groupby("이름", observed=True)["합계금액"].sum().nlargest(n).reset_index()
+
+# 📌 정산 수수료율 (나이스페이 3.3%, 로열티 5%)
+NICEPAY_FEE_RATE = 0.033
+ROYALTY_RATE = 0.05
+# 📌 매출 중 최종 정산 금액의 비율 (수수료와 로열티를 뺀 나머지)
+SETTLEMENT_RATE = 1 - NICEPAY_FEE_RATE - ROYALTY_RATE
+
+def monthly_settlement(cube):
+    """월별 정산 표 (연월, 매출, 건수, 나이스페이 수수료, 로열티, 최종 정산 금액)"""
+    settlement = cube.groupby("연월_str")[["매출", "건수"]].sum().reset_index().rename(columns={"연월_str": "연월"})
+    settlement["나이스페이 수수료"] = settlement["매출"] * NICEPAY_FEE_RATE
+    settlement["로열티"] = settlement["매출"] * ROYALTY_RATE
+    settlement["최종 정산 금액"] = settlement["매출"] - settlement["나이스페이 수수료"] - settlement["로열티"]
+    return settlement.sort_values("연월")
@@ -0,0 +1,285 @@
+"""
+분류 핫패스와 페이지별 집계를 합성 데이터로 측정하는 벤치마크입니다.
+
+    python -m bench.run --sizes 1000 10000 100000
+
+각 단계의 최소 소요 시간(--repeat 회 중)을 bench/results.jsonl 에 누적 기록하고,
+다른 커밋에서 측정한 직전 결과보다 --threshold 배 이상 느려진 단계를 REGRESSION 으로 표시합니다.
+앱 시작(app.py → 업로드 페이지 첫 화면) 시간도 새 프로세스에서 측정해, --startup-budget 을 넘거나
+첫 화면에서 pandas·altair 같은 무거운 모듈을 불러오면 실패로 처리합니다.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from aggregates import monthly_pivot, monthly_stats, monthly_totals
+from event_utils import find_closest_future_event, find_closest_past_event, get_event_index, get_event_type, normal_sales_estimates
+from branches import merge_exports, process_exports
+from derived import DerivedFrame
+from events import classify_orders, process_order_row, CLASSIFIED_COLUMNS, DERIVED_COLUMNS
+from ingest import read_csv_upload, read_xlsx_upload, sniff_header
+from pipeline import canonical_payments, prepare_payments, range_view
+from timeline import build_timeline, window_timeline
+from uplift import UpliftEngine
+
+from bench.synth import payments_csv_bytes, payments_xlsx_bytes
+
+RESULTS_PATH = os.path.join(os.path.dirname(__file__), "results.jsonl")
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 📌 앱 시작(app.py → 업로드 페이지 첫 화면) 시간 예산(초)과, 첫 화면에서 불러오면 안 되는 무거운 모듈
+STARTUP_BUDGET = 0.75
+STARTUP_FORBIDDEN = ["pandas", "pyarrow", "altair", "streamlit_timeline"]
+# 새 파이썬 프로세스에서 app.py 를 한 번 실행하고 {"seconds", "error", "modules"} 를 출력합니다.
+_STARTUP_SCRIPT = """
+import json, logging, sys, time, warnings
+warnings.filterwarnings("ignore")
+logging.disable(logging.CRITICAL)
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=60)
+start = time.perf_counter()
+at.run()
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "error": bool(at.exception), "modules": [m for m in sys.argv[2:] if m in sys.modules]}))
+"""
+
+def _git_rev():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=REPO_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _best_of(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def _normalize(value):
+    """두 분류 경로의 결과를 비교할 수 있는 값으로 바꿉니다. (None/NaN/NaT/NA → None, 날짜 → date, 정수인 실수 → int)"""
+    if value is None or value is pd.NA or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if hasattr(value, "item"):
+        return _normalize(value.item())
+    return value
+
+def classification_mismatches(df_paid):
+    """
+    classify_orders(벡터화)와 process_order_row(행 단위 apply)의 결과를 DERIVED_COLUMNS 모두에서 비교해
+    {컬럼: 다른 행 수} 를 반환합니다. (결측값끼리는 같은 것으로 봅니다. 모두 같으면 빈 사전)
+    """
+    vectorized = classify_orders(df_paid)
+    rowwise = df_paid.apply(process_order_row, axis=1)
+    mismatches = {}
+    for column in DERIVED_COLUMNS:
+        left = [_normalize(value) for value in vectorized[column]]
+        right = [_normalize(value) for value in rowwise[column]]
+        count = sum(a != b for a, b in zip(left, right))
+        if count:
+            mismatches[column] = count
+    return mismatches
+
+def _page_benchmarks(data):
+    """각 결제 로그 페이지의 집계 부분 (차트 렌더링 제외)"""
+    df_paid, cube = data["derived"].require(CLASSIFIED_COLUMNS), data["cube"]
+    today = datetime.today().date()
+
+    def revenue():
+        cube["매출"].sum()
+        cube.groupby("구분", observed=True)["매출"].sum()
+        cube.groupby("날짜")["매출"].sum()
+
+    def monthly():
+        monthly_stats(cube)
+        monthly_totals(cube)
+        for column in ["구분", "결제구분", "주문유형"]:
+            monthly_pivot(cube, column)
+
+    def events():
+        normal_df = df_paid[df_paid["상품 유형"] == "정가"]
+        event_df = df_paid[df_paid["이벤트명"].notnull()]
+        event_df.groupby(["이벤트명", "상품 유형"], observed=True)["합계금액"].sum()
+        normal_sales_estimates(normal_df["합계금액"].sum(), data["min_date"], data["max_date"])
+        UpliftEngine(normal_df, data["min_date"], data["max_date"]).scores(28)
+
+    def period_pass():
+        model = build_timeline(df_paid[df_paid["구분"] == "기간권"], today)
+        window_timeline(model, today, today + pd.Timedelta(days=56))
+
+    def top_members():
+        df_paid.groupby("이름", observed=True)["합계금액"].sum().nlargest(10)
+
+    def member_search():
+        data["name_index"].search("김")
+
+    def date_range():
+        start = data["min_date"] + pd.Timedelta(days=30)
+        end = start + pd.Timedelta(days=90)
+        range_view(data, start, end)
+        data["time_index"].rows(start, end)
+
+    return {
+        "page.매출": revenue,
+        "page.월별 통계": monthly,
+        "page.이벤트 현황": events,
+        "page.기간권": period_pass,
+        "page.회원별 결제 금액": top_members,
+        "page.회원 검색": member_search,
+        "page.조회 기간 변경": date_range,
+    }
+
+def run_size(rows, repeat, rowwise_sample):
+    """rows 행 합성 데이터로 모든 단계를 측정해 {단계: 초} 를 반환합니다."""
+    raw = payments_csv_bytes(rows)
+    results = {}
+
+    results["ingest.sniff_header"] = _best_of(lambda: sniff_header(raw), repeat)
+    results["ingest.read_csv_upload"] = _best_of(lambda: read_csv_upload(raw, "payment"), repeat)
+    df = read_csv_upload(raw, "payment")
+    # 엑셀 읽기는 느리므로 일부 행만 측정해 전체 행 수로 환산합니다. (openpyxl 이 없으면 건너뜁니다)
+    if importlib.util.find_spec("openpyxl") is not None:
+        xlsx_rows = min(rows, rowwise_sample)
+        xlsx_raw = payments_xlsx_bytes(xlsx_rows)
+        per_row = _best_of(lambda: read_xlsx_upload(xlsx_raw, "payment"), 1) / max(xlsx_rows, 1)
+        results["ingest.read_xlsx_upload (환산)"] = per_row * rows
+    results["pipeline.canonical_payments"] = _best_of(lambda: canonical_payments(df), repeat)
+    df = canonical_payments(df)
+
+    results["pipeline.prepare_payments"] = _best_of(lambda: prepare_payments(df), repeat)
+    data = prepare_payments(df)
+    # 파생 컬럼은 페이지가 요청할 때 계산됩니다: 기간권 페이지(파싱만) / 이벤트 현황 페이지(분류까지)
+    results["derived.require(기간권)"] = _best_of(lambda: DerivedFrame(df).require(["시작일", "종료일"]), repeat)
+    results["derived.require(이벤트 현황)"] = _best_of(lambda: DerivedFrame(df).require(CLASSIFIED_COLUMNS), repeat)
+    df_paid = data["derived"].require(CLASSIFIED_COLUMNS)
+
+    results["classify.classify_orders"] = _best_of(lambda: classify_orders(df_paid), repeat)
+    # 행 단위 apply 는 느리므로 일부만 측정해 전체 행 수로 환산합니다.
+    sample = df_paid.head(rowwise_sample)
+    per_row = _best_of(lambda: sample.apply(process_order_row, axis=1), 1) / max(len(sample), 1)
+    results["classify.process_order_row (환산)"] = per_row * len(df_paid)
+    # 벡터화 분류가 행 단위 분류와 같은 결과를 내는지 같은 표본에서 확인합니다.
+    mismatches = classification_mismatches(sample)
+    if mismatches:
+        raise SystemExit(f"🚨 classify_orders 결과가 process_order_row 와 다릅니다 ({rows:,}행 중 표본): {mismatches}")
+
+    order_dt = df_paid["주문일시"]
+    results["events.EventIndex.lookup"] = _best_of(lambda: get_event_index().lookup(order_dt), repeat)
+    sample_rows = [{"주문일시": dt} for dt in order_dt.head(rowwise_sample)]
+    scalar = _best_of(lambda: [
+        (get_event_type(row["주문일시"]), find_closest_past_event(row), find_closest_future_event(row)) for row in sample_rows
+    ], 1)
+    results["events.scalar lookups (환산)"] = scalar / max(len(sample_rows), 1) * len(df_paid)
+
+    for name, func in _page_benchmarks(data).items():
+        results[name] = _best_of(func, repeat)
+
+    # 여러 지점 업로드: 같은 행 수를 3개 지점 파일로 나눠 프로세스 풀에서 읽기·분류·큐브 집계 후 합치기
+    raws = [payments_csv_bytes(rows // 3, seed, branch=branch) for seed, branch in enumerate(["강남점", "홍대점", "신촌점"])]
+    encodings = [sniff_header(branch_raw)[1] for branch_raw in raws]
+    results["branches.process_exports(3개 지점)"] = _best_of(lambda: merge_exports(process_exports(raws, encodings)), 1)
+    return results
+
+def run_startup(repeat):
+    """
+    app.py → 업로드 페이지 첫 화면까지의 시간을 매번 새 파이썬 프로세스에서 측정합니다. (import 캐시가 없는 콜드 스타트)
+    Returns: (가장 빠른 시간(초), 첫 화면에서 불러온 STARTUP_FORBIDDEN 모듈 목록)
+    """
+    best, modules = float("inf"), []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-c", _STARTUP_SCRIPT, os.path.join(REPO_DIR, "app.py"), *STARTUP_FORBIDDEN],
+            capture_output=True, text=True, check=True, cwd=REPO_DIR,
+        )
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        if result["error"]:
+            raise SystemExit("🚨 app.py 첫 실행에서 예외가 발생했습니다.")
+        best = min(best, result["seconds"])
+        modules = result["modules"]
+    return best, modules
+
+def _previous_results(path, git_rev):
+    """git_rev 가 아닌 커밋에서 측정한 가장 최근 결과 {(rows, stage): seconds}"""
+    if not os.path.exists(path):
+        return {}
+    previous = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get("git_rev") != git_rev:
+                previous[(record["rows"], record["stage"])] = record["seconds"]
+    return previous
+
+def main():
+    parser = argparse.ArgumentParser(description="결제 로그 분류/집계 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--rowwise-sample", type=int, default=2_000)
+    parser.add_argument("--threshold", type=float, default=1.2, help="이 배수 이상 느려지면 REGRESSION 으로 표시")
+    parser.add_argument("--out", default=RESULTS_PATH)
+    parser.add_argument("--startup-budget", type=float, default=STARTUP_BUDGET, help="앱 시작(업로드 페이지 첫 화면) 시간 예산(초)")
+    args = parser.parse_args()
+
+    git_rev = _git_rev()
+    previous = _previous_results(args.out, git_rev)
+    meta = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_rev": git_rev,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+    }
+
+    regressions = 0
+    with open(args.out, "a", encoding="utf-8") as f:
+        # 앱 시작 시간은 데이터 크기와 무관하므로 rows=0 으로 기록합니다.
+        stage = "startup.app→upload 첫 화면"
+        seconds, modules = run_startup(args.repeat)
+        f.write(json.dumps({**meta, "rows": 0, "stage": stage, "seconds": seconds}, ensure_ascii=False) + "\n")
+        note = ""
+        before = previous.get((0, stage))
+        if before:
+            note = f"  ({seconds / before:.2f}x)"
+        if seconds > args.startup_budget:
+            note += f"  ⚠️ 예산 {args.startup_budget * 1000:.0f} ms 초과"
+            regressions += 1
+        if modules:
+            note += f"  ⚠️ 첫 화면에서 불러옴: {', '.join(modules)}"
+            regressions += 1
+        print(f"\n▶ 앱 시작\n  {stage:<40} {seconds * 1000:>10.1f} ms{note}")
+
+        for rows in args.sizes:
+            print(f"\n▶ {rows:,} rows")
+            for stage, seconds in run_size(rows, args.repeat, args.rowwise_sample).items():
+                f.write(json.dumps({**meta, "rows": rows, "stage": stage, "seconds": seconds}, ensure_ascii=False) + "\n")
+                before = previous.get((rows, stage))
+                note = ""
+                if before:
+                    ratio = seconds / before
+                    note = f"  ({ratio:.2f}x)"
+                    if ratio >= args.threshold:
+                        note += "  ⚠️ REGRESSION"
+                        regressions += 1
+                print(f"  {stage:<40} {seconds * 1000:>10.1f} ms{note}")
+
+    print(f"\n결과를 {args.out} 에 기록했습니다.")
+    if regressions:
+        raise SystemExit(f"{regressions}개 단계가 이전 결과보다 {args.threshold}배 이상 느려졌습니다.")
+
+if __name__ == "__main__":
+    main()
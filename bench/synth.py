@@ -0,0 +1,170 @@
+"""
+픽코 결제 로그(payment_columns) 형식의 합성 CSV 를 만듭니다. (--out 이 .xlsx 이면 엑셀 파일)
+
+    python -m bench.synth --rows 100000 --out payments_100k.csv
+
+같은 --rows / --seed 이면 항상 같은 파일이 만들어집니다.
+"""
+import argparse
+import io
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from event_utils import event_configs, normal_prices
+from ingest import ORDER_DT_FORMAT, payment_columns
+
+SURNAMES = list("김이박최정강조윤장임한오서신권황안송류홍")
+GIVEN = list("민서준지현우도하윤수영진예주성은연태재희")
+
+# 📌 상품 구성 비율 (정액시간권 / 기간권 / 1회시간권 / 사물함)
+CATEGORY_WEIGHTS = {"정액시간권": 0.30, "기간권": 0.35, "1회시간권": 0.25, "사물함": 0.10}
+# 📌 정액시간권/기간권 중 이벤트 상품 비율
+EVENT_RATE = 0.25
+# 📌 정가/이벤트 상품 중 가격이 맞지 않는 주문 비율
+ABNORMAL_RATE = 0.02
+# 📌 이벤트 상품이 이벤트 기간 밖에서 결제되는 비율 (이벤트 의심)
+SUSPECT_RATE = 0.1
+
+def _members(rng, count):
+    surname = rng.choice(SURNAMES, count)
+    given = rng.choice(GIVEN, (count, 2))
+    return np.char.add(np.char.add(surname, given[:, 0]), given[:, 1])
+
+def _products():
+    """(구분, 상품명, 가격, 이벤트명 또는 None) 목록"""
+    products = []
+    for category in ["정액시간권", "기간권"]:
+        for name, info in normal_prices[category].items():
+            products += [(category, name, price, None) for price in info["price"]]
+        for event, config in event_configs.items():
+            for info in config.get(category, {}).values():
+                products += [(category, info["이벤트상품"], price, event) for price in info["price"]]
+    return pd.DataFrame(products, columns=["구분", "상품", "가격", "이벤트"])
+
+def generate_payments(rows, seed=0, start=datetime(2024, 11, 1), days=365, branch="강남점"):
+    """
+    rows 행의 합성 결제 로그 DataFrame 을 만듭니다.
+    정액시간권/기간권은 normal_prices 와 event_configs 의 상품·가격을 사용하고,
+    이벤트 상품은 대부분 해당 이벤트 기간 안의 주문일시로 만듭니다.
+    """
+    rng = np.random.default_rng(seed)
+    categories = rng.choice(list(CATEGORY_WEIGHTS), rows, p=list(CATEGORY_WEIGHTS.values()))
+    order_dt = pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days * 86400, rows), unit="s")
+    order_dt = pd.Series(order_dt)
+
+    product = pd.Series("", index=range(rows), dtype=object)
+    price = np.zeros(rows, dtype=np.int64)
+    order_name = pd.Series("", index=range(rows), dtype=object)
+
+    # 📌 정액시간권 / 기간권: 정가 또는 이벤트 상품
+    catalog = _products()
+    for category in ["정액시간권", "기간권"]:
+        mask = categories == category
+        items = catalog[catalog["구분"] == category]
+        normal_items = items[items["이벤트"].isna()].reset_index(drop=True)
+        event_items = items[items["이벤트"].notna()].reset_index(drop=True)
+        picked = pd.concat([
+            normal_items.iloc[rng.integers(0, len(normal_items), mask.sum())],
+            event_items.iloc[rng.integers(0, len(event_items), mask.sum())],
+        ]).reset_index(drop=True)
+        take_event = rng.random(mask.sum()) < EVENT_RATE
+        picked = picked.iloc[np.arange(mask.sum()) + np.where(take_event, mask.sum(), 0)].reset_index(drop=True)
+        product[mask] = picked["상품"].to_numpy()
+        price[mask] = picked["가격"].to_numpy()
+
+        # 이벤트 상품은 (SUSPECT_RATE 를 제외하고) 이벤트 기간 안으로 주문일시를 옮깁니다.
+        in_event = picked["이벤트"].notna() & (rng.random(len(picked)) >= SUSPECT_RATE)
+        for event, config in event_configs.items():
+            hit = (in_event & (picked["이벤트"] == event)).to_numpy()
+            if not hit.any():
+                continue
+            evt_start, evt_end = config["이벤트기간"]
+            span = ((evt_end - evt_start).days + 1) * 86400
+            idx = np.flatnonzero(mask)[hit]
+            order_dt.iloc[idx] = pd.Timestamp(evt_start) + pd.to_timedelta(rng.integers(0, span, hit.sum()), unit="s")
+
+    # 📌 가격이 맞지 않는 주문 (비정상)
+    abnormal = np.isin(categories, ["정액시간권", "기간권"]) & (rng.random(rows) < ABNORMAL_RATE)
+    price[abnormal] += 1000
+
+    start_date = order_dt.dt.normalize() + pd.to_timedelta(rng.integers(0, 3, rows), unit="D")
+
+    mask = categories == "정액시간권"
+    order_name[mask] = product[mask] + " 정액시간권"
+
+    mask = categories == "기간권"
+    weeks = product[mask].str.removesuffix("주").astype(int)
+    end_date = start_date[mask] + pd.to_timedelta(weeks * 7 - 1, unit="D")
+    order_name[mask] = (
+        product[mask] + "(" + start_date[mask].dt.strftime("%Y-%m-%d") + "~" + end_date.dt.strftime("%Y-%m-%d") + ") 기간권"
+    )
+
+    mask = categories == "1회시간권"
+    hours = rng.choice([2, 4, 6, 8, 12], mask.sum())
+    day = order_dt[mask].dt.strftime("%Y-%m-%d")
+    order_name[mask] = pd.Series(hours, index=day.index).astype(str) + "시간(" + day + "~" + day + ") 서비스 신청"
+    price[mask] = hours * 1500
+
+    mask = categories == "사물함"
+    locker_end = start_date[mask] + pd.Timedelta(days=27)
+    lockers = pd.Series(rng.integers(1, 60, mask.sum()), index=locker_end.index).astype(str)
+    order_name[mask] = (
+        "사물함 " + lockers + "번(" + start_date[mask].dt.strftime("%Y-%m-%d") + "~" + locker_end.dt.strftime("%Y-%m-%d") + ")"
+    )
+    price[mask] = 10000
+
+    members = _members(rng, max(rows // 8, 10))
+    names = rng.choice(members, rows)
+    names[rng.random(rows) < 0.001] = "관리자"
+
+    discount = np.where(rng.random(rows) < 0.05, 1000, 0)
+    df = pd.DataFrame({
+        "No": np.arange(rows, 0, -1),
+        "브랜드": "스터디카페",
+        "지점": branch,
+        "구분": categories,
+        "이름": names,
+        "주문명": order_name,
+        "주문금액": price + discount,
+        "할인금액": discount,
+        "합계금액": price,
+        "결제구분": rng.choice(["카드", "현금", "계좌이체"], rows, p=[0.85, 0.1, 0.05]),
+        "주문유형": rng.choice(["키오스크", "운영PC", "앱"], rows, p=[0.6, 0.1, 0.3]),
+        "주문상태": rng.choice(["결제완료", "결제취소"], rows, p=[0.97, 0.03]),
+        "주문일시": order_dt.dt.strftime(ORDER_DT_FORMAT),
+    })
+    # 픽코 내보내기처럼 최신 주문이 위로 오도록 정렬
+    df = df.sort_values("주문일시", ascending=False, kind="stable").reset_index(drop=True)
+    df["No"] = np.arange(rows, 0, -1)
+    return df[payment_columns]
+
+def payments_csv_bytes(rows, seed=0, **kwargs):
+    """generate_payments 결과를 픽코와 같은 euc-kr CSV 바이트로 반환합니다."""
+    return generate_payments(rows, seed, **kwargs).to_csv(index=False).encode("euc-kr")
+
+def payments_xlsx_bytes(rows, seed=0, **kwargs):
+    """generate_payments 결과를 픽코 엑셀 내보내기처럼 주문일시는 날짜 셀로 담은 .xlsx 바이트로 반환합니다. (openpyxl 필요)"""
+    df = generate_payments(rows, seed, **kwargs)
+    df["주문일시"] = pd.to_datetime(df["주문일시"], format=ORDER_DT_FORMAT)
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False, engine="openpyxl")
+    return buffer.getvalue()
+
+def main():
+    parser = argparse.ArgumentParser(description="픽코 형식의 합성 결제 로그 CSV 생성")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--branch", default="강남점")
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    with open(args.out, "wb") as f:
+        to_bytes = payments_xlsx_bytes if args.out.endswith(".xlsx") else payments_csv_bytes
+        f.write(to_bytes(args.rows, args.seed, days=args.days, branch=args.branch))
+    print(f"{args.out}: {args.rows:,} rows")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from aggregates import build_daily_cube, merge_cubes
+from derived import DerivedFrame
+from events import CLASSIFIED_COLUMNS
+from ingest import read_upload
+from pipeline import canonical_payments
+from schema import compact_payments, frame_nbytes
+from store import order_keys
+
+# 📌 지점 선택 상자의 "모든 지점 합계" 항목
+ALL_BRANCHES = "전체"
+# 📌 지점 컬럼이 비어 있는 행의 지점 이름
+UNKNOWN_BRANCH = "(지점 없음)"
+# 📌 한 파일의 여러 지점을 나눠 프로세스 풀에서 분류할 최소 파일 크기(MB, 약 8만 행) — 작은 파일은 작업 프로세스를
+# 띄우는 비용이 더 큽니다. 환경 변수 DASHBOARD_SPLIT_MB 로 조정할 수 있습니다.
+SPLIT_MB = float(os.environ.get("DASHBOARD_SPLIT_MB", "10"))
+
+def read_export(raw, encoding=None, progress=None, exclude=None):
+    """
+    결제 로그 파일 하나를 읽어 결제완료 주문을 지점별로 나눕니다.
+    exclude(저장소에 이미 있는 주문 (지점, No) 목록)가 주어지면 그 주문은 빼고 나눕니다.
+
+    Returns:
+        tuple: ({지점: 결제 프레임}, 읽은 원본 프레임 메모리(바이트))
+    """
+    df = read_upload(raw, "payment", encoding, progress=progress)
+    raw_nbytes = frame_nbytes(df)
+    df_paid = canonical_payments(df)
+    if exclude is not None:
+        df_paid = df_paid[~order_keys(df_paid).isin(exclude)]
+    branch = df_paid["지점"].astype(object).fillna(UNKNOWN_BRANCH).astype(str)
+    # 결제완료 주문이 없어도 빈 프레임 하나는 남겨 컬럼 구성을 유지합니다.
+    groups = branch.groupby(branch, sort=False).indices or {UNKNOWN_BRANCH: []}
+    return {name: df_paid.iloc[rows] for name, rows in groups.items()}, raw_nbytes
+
+def process_branch(part):
+    """지점 하나의 결제 프레임에 이벤트 분류 컬럼을 붙이고 일별 큐브를 만듭니다. (프로세스 풀의 작업 단위)"""
+    part = DerivedFrame(part).require(CLASSIFIED_COLUMNS)
+    return part, build_daily_cube(part)
+
+def process_export(raw, encoding=None, progress=None, split=False, exclude=None):
+    """
+    결제 로그 파일 하나를 읽어 지점별로 나누고, 지점마다 이벤트 분류와 일별 큐브까지 계산합니다.
+    프로세스 풀의 작업 단위이므로 결과는 모두 피클 가능한 값입니다. exclude 에 있는 주문은 읽은 뒤 바로 빼므로 분류하지 않습니다.
+    split 이 True 이고 여러 지점이 있으면 분류하지 않은 지점별 프레임을 pending 으로 돌려,
+    호출한 쪽이 지점마다 따로(프로세스 풀에서 동시에) process_branch 를 실행하게 합니다.
+
+    Returns:
+        tuple: ({지점: (분류된 결제 프레임, 큐브)}, {지점: 분류 전 결제 프레임}, 읽은 원본 프레임 메모리(바이트))
+    """
+    parts, raw_nbytes = read_export(raw, encoding, progress, exclude)
+    if split and len(parts) > 1:
+        return {}, parts, raw_nbytes
+    return {name: process_branch(part) for name, part in parts.items()}, {}, raw_nbytes
+
+def _warm_up():
+    # 작업 프로세스가 이 모듈(pandas 등)을 미리 불러오도록 하는 빈 작업입니다.
+    return None
+
+def process_exports(raws, encodings, progress=None, exclude=None):
+    """
+    여러 결제 로그 파일을 process_export 로 처리해 파일마다 ({지점: (분류된 결제 프레임, 큐브)}, 원본 메모리) 를 반환합니다.
+    파일이 여러 개면 코어 수만큼의 프로세스 풀에서 동시에 읽고, SPLIT_MB 이상인 파일에 여러 지점이 있으면
+    지점별로 나눠 분류·큐브 집계도 동시에 처리합니다. 전체 시간은 가장 큰 지점 하나를 처리하는 시간에 가까워집니다.
+    progress 가 주어지면 파일 읽기 진행 비율(0~1)로 호출합니다.
+    exclude(store.stored_order_keys())가 주어지면 저장소에 이미 있는 주문은 빼고 새 주문만 분류합니다.
+    """
+    workers = os.cpu_count() or 1
+    split = [workers > 1 and len(raw) >= SPLIT_MB * 1024 * 1024 for raw in raws]
+    if len(raws) == 1 and not split[0]:
+        classified, _, raw_nbytes = process_export(raws[0], encodings[0], progress, exclude=exclude)
+        return [(classified, raw_nbytes)]
+
+    # Streamlit 서버는 여러 스레드로 동작하므로 fork 대신 spawn 으로 작업 프로세스를 만듭니다.
+    # (작업 프로세스는 제출된 작업 수만큼만 만들어집니다)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        if len(raws) == 1:
+            # 큰 파일 하나: 이 프로세스가 파일을 읽는 동안 작업 프로세스들이 시작되고 모듈을 불러오게 합니다.
+            for _ in range(workers):
+                pool.submit(_warm_up)
+            exports = [process_export(raws[0], encodings[0], progress, split=True, exclude=exclude)]
+        else:
+            exports = [None] * len(raws)
+            futures = {
+                pool.submit(process_export, raw, encoding, split=split_file, exclude=exclude): i
+                for i, (raw, encoding, split_file) in enumerate(zip(raws, encodings, split))
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                exports[futures[future]] = future.result()
+                if progress:
+                    progress(done / len(raws))
+
+        # 📌 지점별로 나눠 둔 파일은 (파일, 지점)마다 process_branch 를 제출합니다.
+        branch_futures = [
+            (classified, name, pool.submit(process_branch, part))
+            for classified, pending, _ in exports for name, part in pending.items()
+        ]
+        for classified, name, future in branch_futures:
+            classified[name] = future.result()
+    return [(classified, raw_nbytes) for classified, _, raw_nbytes in exports]
+
+def merge_exports(results):
+    """
+    process_exports 결과를 합쳐 (전체 결제 프레임, {지점: 큐브, ALL_BRANCHES: 전체 큐브}) 를 반환합니다.
+    같은 지점이 여러 파일에 있으면 중복 주문(No)을 지우고, 실제로 지워진 경우에만 그 지점의 큐브를 다시 만듭니다.
+    """
+    by_branch = {}
+    for parts, _ in results:
+        for name, part in parts.items():
+            by_branch.setdefault(name, []).append(part)
+
+    frames, cubes = [], {}
+    for name, parts in by_branch.items():
+        if len(parts) == 1:
+            frame, cube = parts[0]
+        else:
+            frame = pd.concat([part for part, _ in parts])
+            duplicated = frame["No"].duplicated() & frame["No"].notna()
+            if duplicated.any():
+                frame = frame[~duplicated]
+                cube = build_daily_cube(frame)
+            else:
+                cube = merge_cubes([cube for _, cube in parts])
+        frames.append(frame)
+        cubes[name] = cube
+    cubes[ALL_BRANCHES] = merge_cubes(list(cubes.values())) if len(cubes) > 1 else next(iter(cubes.values()), None)
+
+    # 파일마다 category 값 목록이 다르므로 합친 뒤 다시 category 로 변환합니다.
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].reset_index(drop=True)
+    df = compact_payments(df)
+    periods = [part.attrs.get("주문기간", (None, None)) for parts in by_branch.values() for part, _ in parts]
+    starts = [start for start, _ in periods if start is not None]
+    ends = [end for _, end in periods if end is not None]
+    # ISO 날짜 문자열이므로 문자열 비교가 날짜 순서와 같습니다.
+    df.attrs["주문기간"] = (min(starts), max(ends)) if starts else (None, None)
+    return df, cubes
+
+def branch_names(df):
+    """결제 프레임의 지점 이름 목록 (정렬됨)"""
+    return sorted(df["지점"].astype(object).fillna(UNKNOWN_BRANCH).astype(str).unique())
+
+def select_branch(df, branch):
+    """branch 지점의 행만 남긴 결제 프레임 (ALL_BRANCHES 이면 그대로)"""
+    if branch == ALL_BRANCHES:
+        return df
+    return df[df["지점"].astype(object).fillna(UNKNOWN_BRANCH).astype(str) == branch]
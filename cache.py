@@ -0,0 +1,183 @@
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# 📌 캐시 메모리 한도 (MB) — 환경 변수 DASHBOARD_CACHE_MB 로 조정할 수 있습니다.
+DEFAULT_CACHE_MB = int(os.environ.get("DASHBOARD_CACHE_MB", "512"))
+
+def estimate_nbytes(value):
+    """DataFrame/Series(또는 nbytes 속성이 있는 객체)와 이를 담은 dict·list·tuple 의 대략적인 메모리 사용량(바이트)을 계산합니다."""
+    # 업로드 페이지 첫 화면에서 pandas 를 불러오지 않도록 필요할 때 가져옵니다.
+    import pandas as pd
+
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, dict):
+        # 백그라운드 작업이 사전에 결과를 더하는 중일 수 있으므로 값 목록을 먼저 복사합니다.
+        return sum(estimate_nbytes(v) for v in list(value.values()))
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_nbytes(v) for v in value)
+    return int(getattr(value, "nbytes", 0))
+
+class SharedCache:
+    """
+    처리된 데이터셋을 내용 키(업로드 파일 해시, 설정 해시 등)로 보관하고 프로세스의 모든 세션이 함께 쓰는 LRU 캐시입니다.
+
+    - 같은 키를 여러 세션(스레드)이 동시에 요청하면 한 번만 계산하고 나머지는 그 결과를 기다립니다.
+    - 세션이 사용 중인 항목(참조 수 > 0)은 지우지 않고, 전체 크기가 max_bytes 를 넘으면
+      사용 중이 아닌 항목 중 가장 오래 사용하지 않은 것부터 비웁니다.
+    - 세션은 handle() 로 받은 CacheHandle 을 통해 항목을 참조합니다.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> [value, nbytes, 참조 수, 크기 계산 함수]
+        self._pending = {}  # key -> [계산 중인 Future, 결과를 참조(acquire)하며 기다리는 스레드 수]
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def nbytes(self):
+        with self._lock:
+            return sum(entry[1] for entry in self._entries.values())
+
+    def handle(self):
+        """세션 하나가 참조하는 항목을 관리하는 CacheHandle"""
+        return CacheHandle(self)
+
+    def get_or_compute(self, key, compute, acquire=False, size=estimate_nbytes):
+        """
+        key 의 값을 반환하고, 없으면 compute() 로 계산해 넣습니다. 다른 스레드가 같은 key 를 계산 중이면 그 결과를 기다립니다.
+        acquire 가 True 이면 반환 전에 참조 수를 1 늘립니다. (release 로 되돌립니다)
+        size 는 값의 크기(바이트)를 계산하는 함수이며, 값에 파생 데이터가 더해지면 resize(key) 로 다시 계산합니다.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry[2] += acquire
+                return entry[0]
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._pending[key] = [Future(), 0]
+            else:
+                pending[1] += acquire
+
+        future = pending[0]
+        if not owner:
+            # 먼저 요청한 스레드의 계산 결과를 그대로 받습니다. (참조 수는 그 스레드가 항목을 넣을 때 함께 셉니다)
+            # 항목이 한도보다 커서 곧바로 비워지더라도 다시 계산하지 않습니다. 계산이 실패했으면 같은 예외가 납니다.
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as exc:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(exc)
+            raise
+        nbytes = size(value)
+        with self._lock:
+            # 결과를 기다리는 스레드의 참조까지 센 뒤에 비우므로, 기다리던 세션이 쓰려는 항목은 지워지지 않습니다.
+            self._entries[key] = [value, nbytes, int(acquire) + pending[1], size]
+            del self._pending[key]
+            self._evict()
+        future.set_result(value)
+        return value
+
+    def resize(self, key):
+        """key 값의 크기를 다시 계산합니다. (값에 파생 컬럼이나 계산 결과를 더한 뒤 호출) 한도를 넘으면 항목을 비웁니다."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return
+        nbytes = entry[3](entry[0])
+        with self._lock:
+            if self._entries.get(key) is entry:
+                entry[1] = nbytes
+                self._evict()
+
+    def release(self, key):
+        """참조 수를 1 줄입니다. 한도를 넘은 상태였다면 더 이상 사용되지 않는 항목을 비웁니다."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] > 0:
+                entry[2] -= 1
+            self._evict()
+
+    def _evict(self):
+        # 호출하는 쪽이 self._lock 을 잡고 있어야 합니다. 사용 중인 항목만 남으면 한도를 넘더라도 그대로 둡니다.
+        total = sum(entry[1] for entry in self._entries.values())
+        for key in [key for key, entry in self._entries.items() if entry[2] == 0]:
+            if total <= self.max_bytes:
+                break
+            total -= self._entries.pop(key)[1]
+
+    def stats(self):
+        """항목 수, 전체 크기(바이트), 사용 중인 항목 수"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "nbytes": sum(entry[1] for entry in self._entries.values()),
+                "in_use": sum(1 for entry in self._entries.values() if entry[2] > 0),
+            }
+
+    def clear(self):
+        """사용 중이 아닌 항목을 모두 비웁니다."""
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[2] == 0]:
+                del self._entries[key]
+
+def _release_all(cache, slots):
+    for key in slots.values():
+        cache.release(key)
+    slots.clear()
+
+class CacheHandle:
+    """
+    세션 하나가 SharedCache 에서 참조하는 항목들입니다. 용도(slot, 예: "df", "data")마다 키 하나씩만 참조하며,
+    같은 slot 에 새 키를 가져오면 이전 키의 참조는 놓습니다. 세션이 끝나 핸들이 사라지면 모든 참조를 놓습니다.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self._slots = {}
+        # 핸들 자신을 참조하지 않도록 캐시와 slot 사전만 넘깁니다.
+        self._finalizer = weakref.finalize(self, _release_all, cache, self._slots)
+
+    def get_or_compute(self, slot, key, compute, size=estimate_nbytes):
+        """slot 에 key 의 값을 가져옵니다. (없으면 compute() 로 계산하고, size 로 크기를 셉니다)"""
+        if self._slots.get(slot) == key:
+            return self.cache.get_or_compute(key, compute, size=size)
+        value = self.cache.get_or_compute(key, compute, acquire=True, size=size)
+        previous = self._slots.get(slot)
+        self._slots[slot] = key
+        if previous is not None:
+            self.cache.release(previous)
+        return value
+
+    def release_all(self):
+        _release_all(self.cache, self._slots)
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def shared_cache():
+    """프로세스 전체에서 하나인 SharedCache (Streamlit 의 모든 세션이 함께 사용)"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SharedCache()
+        return _shared
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+def _day_bounds(start, end):
+    """[start, end] 날짜 범위를 [start 00:00, end 다음 날 00:00) 시각 범위로 바꿉니다."""
+    return np.datetime64(pd.Timestamp(start)), np.datetime64(pd.Timestamp(end) + pd.Timedelta(days=1))
+
+def slice_days(frame, start, end, column="날짜"):
+    """column(날짜 오름차순 정렬, NaT 는 맨 뒤) 기준으로 [start, end] 기간의 행만 잘라 반환합니다."""
+    lo, hi = _day_bounds(start, end)
+    days = frame[column].to_numpy()
+    return frame.iloc[days.searchsorted(lo):days.searchsorted(hi)]
+
+class OrderTimeIndex:
+    """
+    주문일시로 정렬한 행 위치 인덱스입니다. 임의 기간의 행 위치를 searchsorted 두 번으로 찾으므로
+    기간을 바꿔도 전체 행을 다시 비교하지 않습니다. (주문일시가 없는 행은 어떤 기간에도 포함되지 않습니다)
+    """
+
+    def __init__(self, order_dt):
+        order_dt = pd.Series(order_dt).reset_index(drop=True)
+        valid = order_dt.notna().to_numpy()
+        times = order_dt.to_numpy()
+        self.order = np.flatnonzero(valid)[np.argsort(times[valid], kind="stable")]
+        self.times = times[self.order]
+
+    def rows(self, start, end):
+        """[start, end] 기간 주문의 행 위치 (원래 순서대로 정렬됨)"""
+        lo, hi = _day_bounds(start, end)
+        return np.sort(self.order[self.times.searchsorted(lo):self.times.searchsorted(hi)])
+
+class RangeTotals:
+    """
+    큐브의 일별 매출/건수를 (전체, 구분별) 누적합 배열로 들고 있어, 임의 기간의 총 매출과 구분별 매출을
+    행이나 큐브를 다시 훑지 않고 누적합의 차이로 바로 구합니다.
+    """
+
+    def __init__(self, cube):
+        daily = cube.groupby("날짜")[["매출", "건수"]].sum()
+        by_category = cube.pivot_table(
+            index="날짜", columns="구분", values=["매출", "건수"], aggfunc="sum", fill_value=0, observed=True
+        ).reindex(daily.index, fill_value=0)
+        self.days = daily.index.to_numpy()
+        self.categories = by_category["매출"].columns.astype(str)
+
+        def _cumsum(values):
+            values = np.asarray(values, dtype=np.float64)
+            return np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)])
+
+        self.cum_sales = _cumsum(daily["매출"])
+        self.cum_count = _cumsum(daily["건수"])
+        self.cum_category = _cumsum(by_category["매출"])
+        self.cum_category_count = _cumsum(by_category["건수"][by_category["매출"].columns])
+
+    def _span(self, start, end):
+        lo, hi = _day_bounds(start, end)
+        return self.days.searchsorted(lo), self.days.searchsorted(hi)
+
+    def total_sales(self, start, end):
+        lo, hi = self._span(start, end)
+        return self.cum_sales[hi] - self.cum_sales[lo]
+
+    def order_count(self, start, end):
+        lo, hi = self._span(start, end)
+        return int(self.cum_count[hi] - self.cum_count[lo])
+
+    def category_sales(self, start, end):
+        """
+        구분별 매출 (aggregates.category_sales 와 같은 형태의 합계금액 Series).
+        큐브 groupby 와 같도록 기간 안에 주문이 있는 구분만 담습니다.
+        """
+        lo, hi = self._span(start, end)
+        sales = pd.Series(
+            self.cum_category[hi] - self.cum_category[lo], index=pd.Index(self.categories, name="구분"), name="합계금액"
+        )
+        return sales[self.cum_category_count[hi] - self.cum_category_count[lo] > 0]
@@ -0,0 +1,53 @@
+import threading
+
+from events import classify_orders, parse_order_columns, PARSED_COLUMNS
+from profiling import stage
+from schema import compact_payments, frame_nbytes
+
+# 📌 파생 컬럼 계산기: 이름 → (만드는 컬럼, 먼저 있어야 하는 파생 컬럼, 계산 함수)
+# 계산 함수는 지금까지의 프레임을 받아 만드는 컬럼만 담은 DataFrame 을 반환합니다.
+PROVIDERS = {
+    "주문명 파싱": (
+        PARSED_COLUMNS,
+        [],
+        parse_order_columns,
+    ),
+    "이벤트 분류": (
+        ["상품 유형", "이벤트명"],
+        PARSED_COLUMNS,
+        lambda df: classify_orders(df, include_as_of=False, parsed=df[PARSED_COLUMNS])[["상품 유형", "이벤트명"]],
+    ),
+}
+
+class DerivedFrame:
+    """
+    결제 로그에 파생 컬럼을 처음 필요할 때만 계산해 붙이는 프레임입니다.
+    페이지는 필요한 컬럼을 require 로 선언하고, 한 번 계산된 컬럼은 이후 재실행과 다른 페이지에서 그대로 재사용됩니다.
+    (로컬 저장소에서 불러와 이미 분류된 컬럼이 있으면 다시 계산하지 않습니다.)
+    공유 캐시를 통해 여러 세션이 같은 인스턴스를 쓰므로, 같은 컬럼을 동시에 요청해도 한 번만 계산합니다.
+    """
+
+    def __init__(self, base):
+        self.frame = base
+        self._lock = threading.RLock()
+
+    @property
+    def nbytes(self):
+        """캐시 메모리 예산 계산용 크기 (문자열 포함)"""
+        return frame_nbytes(self.frame)
+
+    def missing(self, columns):
+        return [col for col in columns if col not in self.frame.columns]
+
+    def require(self, columns):
+        """columns 가 모두 들어 있는 프레임을 반환합니다. 없는 컬럼의 계산기만 (의존 순서대로) 실행합니다."""
+        if not self.missing(columns):
+            return self.frame
+        with self._lock:
+            for name, (provides, depends, compute) in PROVIDERS.items():
+                if set(provides) & set(columns) and self.missing(provides):
+                    self.require(depends)
+                    with stage(name):
+                        # 새 컬럼도 category 로 변환해 붙입니다. (기존 컬럼은 복사하지 않습니다)
+                        self.frame = self.frame.assign(**compact_payments(compute(self.frame)))
+            return self.frame
@@ -1,5 +1,8 @@
+import hashlib
 import re
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
+import numpy as np
+import pandas as pd
 
 # 1. 정가 상품 
 normal_prices = {
@@ -109,6 +112,24 @@ event_configs = {
     },
 }
 
+# 📌 설정 버전 — normal_prices / event_configs 를 바꾼 뒤 config_changed() 를 호출하면 1 늘어나고,
+# 컴파일해 둔 가격표와 이벤트 인덱스는 다음 호출에서 다시 만들어집니다. (매 호출마다 설정 전체를 비교하지 않습니다)
+_config_version = 0
+
+def config_changed():
+    """normal_prices / event_configs 를 바꾼(다시 불러온) 뒤 호출합니다. 설정으로 컴파일한 캐시를 무효화합니다."""
+    global _config_version
+    _config_version += 1
+
+_config_hash_cache = {"version": None, "hash": None}
+
+def config_hash():
+    """normal_prices / event_configs 내용의 해시 (설정이 바뀌면 캐시된 분류 결과를 다시 계산하기 위한 키)"""
+    if _config_hash_cache["version"] != _config_version:
+        _config_hash_cache["hash"] = hashlib.sha256(repr((normal_prices, event_configs)).encode("utf-8")).hexdigest()
+        _config_hash_cache["version"] = _config_version
+    return _config_hash_cache["hash"]
+
 def 기간권_parser(order_text):
     m = re.search(r"(\d{4}-\d{2}-\d{2})~(\d{4}-\d{2}-\d{2})", order_text)
     start_date = datetime.strptime(m.group(1), "%Y-%m-%d").date()
@@ -122,108 +143,251 @@ def 정액시간권_parser(order_text):
     actual  = re.match(r"^(\d+시간)", order_text).group(1)
     return actual
 
-def is_normal_product(row):
-    order_text = row["주문명"].strip() #"2시간(2025-02-27~2025-02-27) 서비스 신청"
-    category = row["구분"].strip() #정액시간권 or 기간권
-    order_amount = int(str(row["합계금액"]).strip()) #85000
+class PriceTable:
+    """
+    normal_prices / event_configs 를 (구분, 상품, 금액) 키의 해시 테이블로 컴파일한 가격표입니다.
+    정가/이벤트 상품 여부는 가격표 크기와 상관없이 한 번의 조회로 판정됩니다.
+    normal_index / event_index 는 같은 키를 MultiIndex 로 담고 있어 컬럼 전체를 isin 으로 조인할 때 사용합니다.
+    """
 
-    found = False
+    def __init__(self, normal_prices, event_configs):
+        self.normal = frozenset(
+            (category, product, price)
+            for category, items in normal_prices.items()
+            for product, info in items.items()
+            for price in info["price"]
+        )
+        self.events = {
+            event: frozenset(
+                (category, info["이벤트상품"], price)
+                for category in ["정액시간권", "기간권"]
+                for info in config.get(category, {}).values()
+                for price in info["price"]
+            )
+            for event, config in event_configs.items()
+        }
+        self.normal_index = pd.MultiIndex.from_tuples(sorted(self.normal), names=["구분", "상품", "금액"])
+        self.event_index = pd.MultiIndex.from_tuples(
+            sorted((event, *key) for event, keys in self.events.items() for key in keys),
+            names=["이벤트명", "구분", "상품", "금액"],
+        )
 
-    if category == "기간권":
-        actual = 기간권_parser(order_text)
+    def is_normal(self, category, product, price):
+        return (category, product, price) in self.normal
 
-        for key, info in normal_prices["기간권"].items():
-            if actual == key and order_amount in info["price"]:
-                found = True
-                break
+    def is_event(self, event_name, category, product, price):
+        return (category, product, price) in self.events[event_name]
 
-    elif category == "정액시간권":
-        actual  = 정액시간권_parser(order_text)
-        
-        for key, info in normal_prices["정액시간권"].items():
-            if actual == key and order_amount in info["price"]:
-                found = True
-                break
 
-    else:
-        raise ValueError(f"Invalid category: {category}")
+_price_table_cache = {"version": None, "table": None}
 
-    return found
+def get_price_table():
+    """
+    현재 normal_prices / event_configs 로 만든 PriceTable 을 반환합니다.
+    config_changed() 로 설정 버전이 바뀌면 다음 호출에서 다시 컴파일합니다.
+    """
+    if _price_table_cache["version"] != _config_version:
+        _price_table_cache["table"] = PriceTable(normal_prices, event_configs)
+        _price_table_cache["version"] = _config_version
+    return _price_table_cache["table"]
 
-def is_event_product(event_name, row):
+def _parse_product(row):
     order_text = row["주문명"].strip() #"2시간(2025-02-27~2025-02-27) 서비스 신청"
     category = row["구분"].strip() #정액시간권 or 기간권
     order_amount = int(str(row["합계금액"]).strip()) #85000
 
-    if category == "정액시간권":
-        actual  = 정액시간권_parser(order_text)
-
-        for key, info in event_configs[event_name]["정액시간권"].items():
-            if actual == info["이벤트상품"] and order_amount in info["price"]:
-                return True
-        return False
-
-    elif category == "기간권":
+    if category == "기간권":
         actual = 기간권_parser(order_text)
-        for key, info in event_configs[event_name]["기간권"].items():
-            if actual == info["이벤트상품"] and order_amount in info["price"]:
-                return True
-        return False
-
+    elif category == "정액시간권":
+        actual = 정액시간권_parser(order_text)
     else:
         raise ValueError(f"Invalid category: {category}")
 
+    return category, actual, order_amount
+
+def is_normal_product(row):
+    return get_price_table().is_normal(*_parse_product(row))
+
+def is_event_product(event_name, row):
+    return get_price_table().is_event(event_name, *_parse_product(row))
+
 def is_in_event_period(event_name, row):
     order_dt = row["주문일시"]
     start, end = event_configs[event_name]["이벤트기간"]
     end_full = datetime.combine(end.date(), time(23, 59, 59))
     return start <= order_dt <= end_full
 
+class EventIndex:
+    """
+    event_configs 의 이벤트 기간을 정렬된 배열로 컴파일한 인덱스입니다.
+    주문일시 하나 또는 컬럼 전체에 대해 "포함하는 이벤트", "가장 가까운 과거/미래 이벤트와 거리(일수)"를
+    searchsorted 로 O(log E) 에 찾습니다. 여러 이벤트가 겹치면 event_configs 순서상 먼저 나온 이벤트가 우선합니다.
+    """
+
+    def __init__(self, configs):
+        self.names = np.array(list(configs), dtype=object)
+        starts = np.array([np.datetime64(c["이벤트기간"][0], "ns") for c in configs.values()], dtype="datetime64[ns]")
+        ends = np.array(
+            [np.datetime64(datetime.combine(c["이벤트기간"][1].date(), time(23, 59, 59)), "ns") for c in configs.values()],
+            dtype="datetime64[ns]",
+        )
+        starts = starts.astype(np.int64)
+        ends = ends.astype(np.int64)
+
+        # 포함 이벤트: 시작/종료 경계로 나눈 구간 [bounds[i], bounds[i+1]) 마다 담당 이벤트를 미리 계산
+        self._bounds = np.unique(np.concatenate([starts, ends + 1]))
+        covering = (starts[None, :] <= self._bounds[:, None]) & (self._bounds[:, None] <= ends[None, :])
+        self._owner = np.where(covering.any(axis=1), covering.argmax(axis=1), -1)
+
+        # 과거 이벤트: 종료 시각 오름차순 / 미래 이벤트: 시작 시각 오름차순 (같은 시각이면 먼저 정의된 이벤트)
+        self._ends, first = np.unique(ends, return_index=True)
+        self._end_owner = first
+        self._starts, first = np.unique(starts, return_index=True)
+        self._start_owner = first
+
+    def lookup(self, order_dt):
+        """
+        주문일시 Series 를 받아 이벤트/과거이벤트/과거거리/미래이벤트/미래거리 컬럼을 갖는 DataFrame 을 반환합니다.
+        해당 이벤트가 없거나 주문일시가 NaT 인 경우 None(거리는 NaN)입니다.
+        """
+        order_dt = pd.to_datetime(pd.Series(order_dt), errors="coerce")
+        valid = order_dt.notna().to_numpy() & (len(self.names) > 0)
+        t = order_dt.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        day = np.int64(86400 * 10**9)
+        names = np.append(self.names, None)  # -1 → None
+
+        def _take(owners, values, pos, found):
+            pos = np.clip(pos, 0, max(len(values) - 1, 0))
+            if not len(values):
+                return np.full(len(t), -1), np.full(len(t), np.nan)
+            return np.where(found, owners[pos], -1), np.where(found, np.abs(values[pos] - t) // day, np.nan)
+
+        pos = np.searchsorted(self._bounds, t, side="right") - 1
+        owner, _ = _take(self._owner, self._bounds, pos, valid & (pos >= 0))
+
+        pos = np.searchsorted(self._ends, t, side="right") - 1
+        past_owner, past_dist = _take(self._end_owner, self._ends, pos, valid & (pos >= 0))
+
+        pos = np.searchsorted(self._starts, t, side="left")
+        future_owner, future_dist = _take(self._start_owner, self._starts, pos, valid & (pos < len(self._starts)))
+
+        return pd.DataFrame({
+            "이벤트": names[owner],
+            "과거이벤트": names[past_owner],
+            "과거거리": past_dist,
+            "미래이벤트": names[future_owner],
+            "미래거리": future_dist,
+        }, index=order_dt.index)
+
+    def closest(self, order_dt):
+        """주문일시 하나에 대해 (이벤트, 과거이벤트, 과거거리, 미래이벤트, 미래거리) 튜플을 반환합니다."""
+        if pd.isna(order_dt) or not len(self.names):
+            return None, None, None, None, None
+        t = pd.Timestamp(order_dt).value
+        day = 86400 * 10**9
+
+        pos = int(np.searchsorted(self._bounds, t, side="right")) - 1
+        owner = self._owner[pos] if pos >= 0 else -1
+        event = self.names[owner] if owner >= 0 else None
+
+        past = past_dist = None
+        pos = int(np.searchsorted(self._ends, t, side="right")) - 1
+        if pos >= 0:
+            past, past_dist = self.names[self._end_owner[pos]], int((t - self._ends[pos]) // day)
+
+        future = future_dist = None
+        pos = int(np.searchsorted(self._starts, t, side="left"))
+        if pos < len(self._starts):
+            future, future_dist = self.names[self._start_owner[pos]], int((self._starts[pos] - t) // day)
+
+        return event, past, past_dist, future, future_dist
+
+
+_event_index_cache = {"version": None, "index": None}
+
+def get_event_index():
+    """
+    현재 event_configs 로 만든 EventIndex 를 반환합니다.
+    config_changed() 로 설정 버전이 바뀌면 다음 호출에서 다시 만듭니다.
+    """
+    if _event_index_cache["version"] != _config_version:
+        _event_index_cache["index"] = EventIndex(event_configs)
+        _event_index_cache["version"] = _config_version
+    return _event_index_cache["index"]
+
+# 📌 import 시점에 가격표와 이벤트 인덱스를 미리 컴파일해 둡니다.
+get_price_table()
+get_event_index()
+
 def get_event_type(order_date):
     """
     주문일시(order_date)를 입력받아, event_configs에 정의된
     이벤트 기간(종료일은 23:59:59까지 포함)에 해당하면 이벤트 이름을 반환합니다.
     해당하는 이벤트가 없으면 None을 반환합니다.
     """
-    for event, config in event_configs.items():
-        start, end = config["이벤트기간"]
-        event_end = datetime.combine(end.date(), time(23, 59, 59))
-        if start <= order_date <= event_end:
-            return event
-    return None
+    return get_event_index().closest(order_date)[0]
 
 # FIND 함수들 (과거/미래 이벤트와 거리(일수)를 함께 반환)
 def find_closest_past_event(row):
-    order_dt = row["주문일시"]
-    closest_event = None
-    closest_distance = None
-    for event, config in event_configs.items():
-        start, end = config["이벤트기간"]
-        event_end = datetime.combine(end.date(), time(23, 59, 59))
-        if event_end <= order_dt:
-            diff = (order_dt - event_end).days
-            if closest_distance is None or diff < closest_distance:
-                closest_distance = diff
-                closest_event = event
-    return closest_event, closest_distance
+    _, event, distance, _, _ = get_event_index().closest(row["주문일시"])
+    return event, distance
 
 def find_closest_future_event(row):
-    order_dt = row["주문일시"]
-    closest_event = None
-    closest_distance = None
-    for event, config in event_configs.items():
-        start, end = config["이벤트기간"]
-        if start >= order_dt:
-            diff = (start - order_dt).days
-            if closest_distance is None or diff < closest_distance:
-                closest_distance = diff
-                closest_event = event
-    return closest_event, closest_distance
+    _, _, _, event, distance = get_event_index().closest(row["주문일시"])
+    return event, distance
+
+def event_periods(configs=None):
+    """이벤트별 (시작일, 종료일) 날짜 DataFrame (index: 이벤트명, 설정 순서)"""
+    configs = event_configs if configs is None else configs
+    return pd.DataFrame(
+        [(start.date(), end.date()) for start, end in (config["이벤트기간"] for config in configs.values())],
+        index=pd.Index(list(configs), name="이벤트명"),
+        columns=["시작일", "종료일"],
+    )
+
+def count_event_days(periods, overall_start_date, overall_end_date):
+    """
+    전체 기간과 겹치는 이벤트 날짜 수를 셉니다. 이벤트 기간이 서로 겹치는 날은 한 번만 셉니다.
+    이벤트를 시작일 순으로 정렬한 뒤 한 번 훑으며 구간을 합치므로 O(E log E) 입니다.
+    """
+    total = 0
+    covered_until = None  # 지금까지 센 마지막 날
+    for start, end in sorted(zip(periods["시작일"], periods["종료일"])):
+        start, end = max(start, overall_start_date), min(end, overall_end_date)
+        if covered_until is not None:
+            start = max(start, covered_until + timedelta(days=1))
+        if start <= end:
+            total += (end - start).days + 1
+            covered_until = end
+    return total
+
+def normal_sales_estimates(total_normal_sales, overall_start_date, overall_end_date, configs=None):
+    """
+    모든 이벤트의 예상 정가 매출을 한 번에 계산합니다.
+    전체 데이터 기간 중 이벤트가 없는 날(이벤트 기간의 합집합을 제외한 날)의 정가 매출 일평균에
+    각 이벤트 기간 일수를 곱합니다. 이벤트가 늘어나도 정가 매출 합계와 이벤트 날짜 합집합은 한 번만 계산됩니다.
+
+    Returns:
+        DataFrame (index: 이벤트명): 예상 정가 매출, 이벤트 일수, 일평균 정가 매출, 비이벤트 일수
+    """
+    periods = event_periods(configs)
+    overall_duration = (overall_end_date - overall_start_date).days + 1
+    non_event_days = overall_duration - count_event_days(periods, overall_start_date, overall_end_date)
+    avg_normal_sales_per_day = total_normal_sales / non_event_days if non_event_days > 0 else 0
+
+    event_duration = (pd.to_datetime(periods["종료일"]) - pd.to_datetime(periods["시작일"])).dt.days + 1
+    return pd.DataFrame({
+        "예상 정가 매출": event_duration * avg_normal_sales_per_day,
+        "이벤트 일수": event_duration,
+        "일평균 정가 매출": avg_normal_sales_per_day,
+        "비이벤트 일수": max(non_event_days, 0),
+    })
 
 def calc_normal_sales_estimate(event_name, normal_df, overall_start_date, overall_end_date):
     """
     전체 데이터 기간 중, 이벤트 기간을 전부 제외한 날에 발생한 정가 매출 평균을 계산한 후,
     해당 이벤트 기간 일수만큼 곱하여 예상 정가 매출을 산출합니다.
+    (이벤트 하나만 필요할 때 사용합니다. 여러 이벤트는 normal_sales_estimates 로 한 번에 계산하세요.)
     
     Parameters:
         event_name (str): 이벤트 이름 (예: "25새해")
@@ -232,41 +396,10 @@ def calc_normal_sales_estimate(event_name, normal_df, overall_start_date, overal
         overall_end_date (date): 전체 데이터 기간의 종료일
         
     Returns:
-        float: 이벤트 기간 동안의 예상 정가 매출
+        tuple: (예상 정가 매출, 이벤트 일수, 일평균 정가 매출, 비이벤트 일수)
     """
-    # 이벤트 기간 가져오기
     if event_name not in event_configs:
         raise ValueError(f"알 수 없는 이벤트 이름: {event_name}")
-    evt_start, evt_end = event_configs[event_name]["이벤트기간"]
-    evt_start_date = evt_start.date()
-    evt_end_date = evt_end.date()
-    event_duration = (evt_end_date - evt_start_date).days + 1
-
-    # 전체 데이터 기간의 일수 계산
-    overall_duration = (overall_end_date - overall_start_date).days + 1
-
-    # 전체 기간 중, 모든 이벤트 기간(중복 고려 없이)의 총 일수 계산
-    total_event_days = 0
-    for evt, config in event_configs.items():
-        evt_s, evt_e = config["이벤트기간"]
-        evt_s_date = evt_s.date()
-        evt_e_date = evt_e.date()
-        # 전체 기간과 해당 이벤트 기간의 교집합 일수 계산
-        overlap_start = max(overall_start_date, evt_s_date)
-        overlap_end = min(overall_end_date, evt_e_date)
-        if overlap_start <= overlap_end:
-            total_event_days += (overlap_end - overlap_start).days + 1
-
-    # 이벤트 기간을 제외한 날 수
-    non_event_days = overall_duration - total_event_days
-    if non_event_days <= 0:
-        return 0
-
-    # 정가 매출 총합과 일일 평균 정가 매출 계산
     total_normal_sales = normal_df["합계금액"].sum()
-    avg_normal_sales_per_day = total_normal_sales / non_event_days
-
-    # 해당 이벤트 기간에 해당하는 예상 정가 매출 산출
-    estimated_normal_sales = avg_normal_sales_per_day * event_duration
-
-    return estimated_normal_sales , event_duration, avg_normal_sales_per_day, non_event_days
+    row = normal_sales_estimates(total_normal_sales, overall_start_date, overall_end_date).loc[event_name]
+    return row["예상 정가 매출"], int(row["이벤트 일수"]), row["일평균 정가 매출"], int(row["비이벤트 일수"])
@@ -2,8 +2,40 @@ import re
 from datetime import datetime, time
 import pandas as pd
 from event_utils import 정액시간권_parser, 기간권_parser, is_normal_product, get_event_type, is_event_product, find_closest_past_event, find_closest_future_event
+from event_utils import get_event_index, get_price_table
 
-def process_order_row(row):
+# 📌 process_order_row / classify_orders 가 만들어내는 파생 컬럼
+DERIVED_COLUMNS = ["시간", "기간", "상품 유형", "이벤트명", "시작일", "종료일", "남은일수", "D-Day", "만료여부"]
+# 📌 기준일(as_of, 기본은 오늘)에 따라 달라지는 컬럼 (저장하지 않고 as_of_columns 로 필요할 때 계산)
+# D-Day 문자열은 저장하지 않고, 화면에 표시할 때 남은일수로부터 format_dday 로 만듭니다.
+AS_OF_COLUMNS = ["남은일수", "만료여부"]
+# 📌 주문마다 한 번 정해지면 바뀌지 않아 캐시·저장할 수 있는 컬럼
+CLASSIFIED_COLUMNS = [col for col in DERIVED_COLUMNS if col not in AS_OF_COLUMNS + ["D-Day"]]
+# 📌 그중 주문명 정규식만으로 얻는 컬럼 (parse_order_columns)
+PARSED_COLUMNS = ["시간", "기간", "시작일", "종료일"]
+
+def process_order_row(row, as_of=None):
+    """한 주문의 분류 컬럼(classify_order_row)과 기준일(as_of, 기본 오늘) 기준 남은일수/D-Day/만료여부"""
+    classified = classify_order_row(row)
+    end_date_val = classified["종료일"]
+    if pd.notna(end_date_val):
+        as_of = as_of or datetime.today().date()
+        remaining_days = (end_date_val - as_of).days
+        d_day_str = f"D-{remaining_days}" if remaining_days >= 0 else f"D+{abs(remaining_days)}"
+        expired = end_date_val < as_of
+    else:
+        remaining_days = None
+        d_day_str = None
+        expired = None
+
+    return pd.concat([classified, pd.Series({
+        "남은일수": remaining_days,
+        "D-Day": d_day_str,
+        "만료여부": expired
+    })])
+
+def classify_order_row(row):
+    """한 주문의 분류 컬럼(CLASSIFIED_COLUMNS) — 주문 정보만으로 정해지며 날짜가 바뀌어도 그대로입니다."""
     # 기본 값 추출
     category = row["구분"].strip()          # "정액시간권" or "기간권"
     
@@ -14,10 +46,7 @@ def process_order_row(row):
             "상품 유형": None,
             "이벤트명": None,
             "시작일": None,
-            "종료일": None,
-            "남은일수": None,
-            "D-Day": None,
-            "만료여부": None
+            "종료일": None
         })
     
     order_text = row["주문명"].strip()
@@ -76,16 +105,9 @@ def process_order_row(row):
         m = re.search(r"(\d{4}-\d{2}-\d{2})~(\d{4}-\d{2}-\d{2})", order_text)
         start_date_val = datetime.strptime(m.group(1), "%Y-%m-%d").date()
         end_date_val = datetime.strptime(m.group(2), "%Y-%m-%d").date()
-        today = datetime.today().date()
-        remaining_days = (end_date_val - today).days
-        d_day_str = f"D-{remaining_days}" if remaining_days >= 0 else f"D+{abs(remaining_days)}"
-        expired = end_date_val < today
     else:
         start_date_val = None
         end_date_val = None
-        remaining_days = None
-        d_day_str = None
-        expired = None
 
     return pd.Series({
         "시간": actual_usage,
@@ -93,8 +115,112 @@ def process_order_row(row):
         "상품 유형": classification,
         "이벤트명": event_name_out,
         "시작일": start_date_val,
-        "종료일": end_date_val,
-        "남은일수": remaining_days,
-        "D-Day": d_day_str,
-        "만료여부": expired
-    })
\ No newline at end of file
+        "종료일": end_date_val
+    })
+
+def _as_object(values, mask):
+    return values.astype(object).where(mask & values.notna(), None)
+
+def parse_order_columns(df):
+    """
+    주문명에서 시간(정액시간권)과 기간/시작일/종료일(기간권)만 정규식으로 한 번에 뽑습니다. (PARSED_COLUMNS)
+    가격표·이벤트 조회가 없어 classify_orders 보다 가볍고, 결과는 classify_orders 의 같은 컬럼과 같습니다.
+    """
+    category = df["구분"].astype(str).str.strip()
+    order_text = df["주문명"].astype(str).str.strip()
+    is_time = category == "정액시간권"
+    is_period = category == "기간권"
+
+    # 실제 이용시간/기간 파싱 (정액시간권_parser / 기간권_parser 와 같은 정규식)
+    actual_usage = order_text.str.extract(r"^(\d+시간)", expand=False).where(is_time)
+    dates = order_text.str.extract(r"(\d{4}-\d{2}-\d{2})~(\d{4}-\d{2}-\d{2})")
+    start_dt = pd.to_datetime(dates[0].where(is_period), format="%Y-%m-%d", errors="coerce")
+    end_dt = pd.to_datetime(dates[1].where(is_period), format="%Y-%m-%d", errors="coerce")
+    weeks = ((end_dt - start_dt).dt.days + 1) // 7
+    period_str = (weeks.astype("Int64").astype(str) + "주").where(start_dt.notna() & end_dt.notna())
+
+    return pd.DataFrame({
+        "시간": _as_object(actual_usage, is_time),
+        "기간": _as_object(period_str, is_period),
+        "시작일": start_dt,
+        "종료일": end_dt,
+    }, index=df.index)
+
+def classify_orders(df, include_as_of=True, as_of=None, parsed=None):
+    """
+    process_order_row 를 행마다 apply 하는 대신, 결제 데이터 전체를 한 번에 분류합니다.
+    결과는 process_order_row 와 동일한 9개 파생 컬럼(DERIVED_COLUMNS)을 갖는 DataFrame 이며(시작일/종료일은 datetime64),
+    인덱스는 입력 df 와 같습니다. include_as_of=False 이면 기준일과 무관한 컬럼(CLASSIFIED_COLUMNS)만 반환합니다.
+    이미 parse_order_columns 로 뽑아 둔 컬럼이 있으면 parsed 로 넘겨 정규식 파싱을 건너뜁니다.
+    """
+    if parsed is None:
+        parsed = parse_order_columns(df)
+    category = df["구분"].astype(str).str.strip()
+    order_dt = pd.to_datetime(df["주문일시"], errors="coerce")
+    order_amount = pd.to_numeric(df["합계금액"].astype(str).str.strip(), errors="coerce")
+
+    is_time = category == "정액시간권"
+    is_period = category == "기간권"
+    target = is_time | is_period
+
+    # (구분, 상품, 금액) 키로 컴파일된 가격표와 조인
+    product = parsed["시간"].astype(object).where(is_time, parsed["기간"].astype(object))
+    keys = pd.MultiIndex.from_arrays([category, product, order_amount])
+
+    prices = get_price_table()
+    is_normal = target & keys.isin(prices.normal_index)
+
+    # 이벤트 기간(종료일은 23:59:59까지 포함) 판정 — 정렬된 이벤트 인덱스로 한 번에 조회
+    found = get_event_index().lookup(order_dt)
+    current_event = found["이벤트"]
+
+    is_event = target & pd.MultiIndex.from_arrays([current_event, category, product, order_amount]).isin(prices.event_index)
+
+    # 이벤트 기간 밖: 가까운 과거/미래 이벤트 중 거리(일수)가 작은 쪽 (같으면 과거)
+    past_event, past_dist = found["과거이벤트"], found["과거거리"]
+    future_event, future_dist = found["미래이벤트"], found["미래거리"]
+    use_past = past_event.notna() & (future_event.isna() | (past_dist <= future_dist))
+    suspected_event = past_event.where(use_past, future_event)
+
+    in_event = current_event.notna()
+    classification = pd.Series("비정상", index=df.index, dtype=object)
+    classification = classification.mask(~in_event & suspected_event.notna(), "이벤트 의심")
+    classification = classification.mask(in_event & is_event, "이벤트")
+    classification = classification.mask(is_normal, "정가")
+
+    event_name_out = current_event.where(in_event & is_event, suspected_event.where(~in_event))
+    event_name_out = event_name_out.where(~is_normal)
+
+    classified = pd.DataFrame({
+        "시간": parsed["시간"],
+        "기간": parsed["기간"],
+        "상품 유형": _as_object(classification, target),
+        "이벤트명": _as_object(event_name_out, target),
+        "시작일": parsed["시작일"],
+        "종료일": parsed["종료일"],
+    }, index=df.index)
+    if not include_as_of:
+        return classified
+    classified = classified.join(as_of_columns(classified["종료일"], as_of))
+    classified["D-Day"] = format_dday(classified["남은일수"])
+    return classified[DERIVED_COLUMNS]
+
+def as_of_columns(end_date, as_of=None):
+    """
+    기간권 종료일 Series 로부터 기준일(as_of, 기본 오늘) 기준 남은일수(Int32)와 만료여부(boolean) 컬럼을 계산합니다.
+    과거 날짜를 넣으면 다시 분류하지 않고 그날 기준의 기간권 상태를 볼 수 있습니다. 종료일이 없는 행은 <NA> 입니다.
+    """
+    as_of = pd.Timestamp(as_of if as_of is not None else datetime.today().date())
+    end_dt = pd.to_datetime(end_date, errors="coerce")
+    has_end = end_dt.notna()
+
+    return pd.DataFrame({
+        "남은일수": (end_dt - as_of).dt.days.astype("Int32"),
+        "만료여부": (end_dt < as_of).astype("boolean").where(has_end),
+    }, index=end_dt.index)
+
+def format_dday(remaining_days):
+    """남은일수 Series 를 화면 표시용 "D-3" / "D+2" 문자열로 바꿉니다. (남은일수가 없으면 None)"""
+    remaining_days = remaining_days.astype("Int64")
+    d_day = pd.Series("D-", index=remaining_days.index).mask(remaining_days < 0, "D+") + remaining_days.abs().astype(str)
+    return d_day.astype(object).where(remaining_days.notna(), None)
@@ -0,0 +1,207 @@
+import csv
+import io
+from datetime import datetime
+
+import pandas as pd
+
+# 📌 픽코 내보내기 파일은 euc-kr 로 저장되지만, 확장 문자가 섞이면 cp949 로만 읽힙니다.
+ENCODINGS = ("euc-kr", "cp949")
+
+# 📌 파일 종류별 필수 컬럼
+payment_columns = ["No", "브랜드", "지점", "구분", "이름", "주문명", "주문금액", "할인금액", "합계금액", "결제구분", "주문유형", "주문상태", "주문일시"]
+member_columns = ["NO", "이름", "생년월일", "성별", "사물함", "신발장", "휴대폰", "PIN번호", "수신", "보호자", "휴대폰2", "수신2", "상태", "이용권", "좌석", "좌석타입", "시작일", "종료일", "잔여", "전체", "이용금액"]
+
+# 📌 결제 로그 컬럼 타입 (주문일시는 읽은 뒤 ORDER_DT_FORMAT 으로 변환)
+payment_dtypes = {
+    **{col: str for col in payment_columns},
+    "No": "Int64",
+    "주문금액": "Int64",
+    "할인금액": "Int64",
+    "합계금액": "Int64",
+}
+member_dtypes = {col: str for col in member_columns}
+
+ORDER_DT_FORMAT = "%Y-%m-%d %H:%M:%S"
+CHUNK_SIZE = 50_000
+
+# 📌 .xlsx 는 zip 파일이므로 zip 시그니처로 CSV 와 구분합니다.
+XLSX_SIGNATURE = b"PK\x03\x04"
+# 📌 엑셀 파일에서 헤더 행을 찾을 때 살펴볼 최대 행 수 (제목 행이 먼저 있는 경우 대비)
+XLSX_HEADER_SCAN_ROWS = 10
+
+def is_xlsx(raw):
+    return raw[:4] == XLSX_SIGNATURE
+
+def _file_type(columns):
+    columns = set(columns)
+    if set(payment_columns).issubset(columns):
+        return "payment"
+    if set(member_columns).issubset(columns):
+        return "member"
+    return None
+
+def sniff_header(raw):
+    """
+    파일 첫 줄만 디코딩해 (파일 종류, 인코딩)을 반환합니다.
+    파일 종류는 "payment" / "member" 이며, 어느 쪽 필수 컬럼도 갖추지 못했으면 None 입니다.
+    .xlsx 파일은 첫 시트의 헤더 행만 읽으며, 인코딩은 None 입니다.
+    """
+    if is_xlsx(raw):
+        workbook = _open_workbook(raw)
+        try:
+            file_type, _, _ = _xlsx_header(workbook.active.iter_rows(values_only=True))
+        finally:
+            workbook.close()
+        return file_type, None
+
+    first_line = raw[:raw.find(b"\n")] if b"\n" in raw else raw
+    for encoding in ENCODINGS:
+        try:
+            header = next(csv.reader([first_line.decode(encoding).strip("\r\ufeff")]), [])
+        except UnicodeDecodeError:
+            continue
+        return _file_type(header), encoding
+    return None, None
+
+def parse_order_datetime(values):
+    """주문일시 문자열을 고정 형식으로 변환하고, 형식이 다른 값만 추론 방식으로 다시 변환합니다."""
+    parsed = pd.to_datetime(values, format=ORDER_DT_FORMAT, errors="coerce")
+    retry = parsed.isna() & values.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(values[retry], format="mixed", errors="coerce")
+    return parsed
+
+def read_csv_upload(raw, file_type, encoding=None, chunksize=CHUNK_SIZE, progress=None):
+    """
+    업로드된 CSV 바이트(raw)를 필요한 컬럼만, 지정된 타입으로 chunksize 행씩 읽어 하나의 DataFrame 으로 반환합니다.
+    progress 가 주어지면 읽은 비율(0~1)로 호출합니다. encoding 으로 읽다가 디코딩 오류가 나면
+    ENCODINGS 의 다음 인코딩으로 처음부터 다시 읽습니다.
+    """
+    columns = payment_columns if file_type == "payment" else member_columns
+    dtypes = payment_dtypes if file_type == "payment" else member_dtypes
+    candidates = [encoding] + [e for e in ENCODINGS if e != encoding] if encoding else list(ENCODINGS)
+
+    for i, candidate in enumerate(candidates):
+        buffer = io.BytesIO(raw)
+        chunks = []
+        try:
+            reader = pd.read_csv(
+                buffer,
+                encoding=candidate,
+                usecols=columns,
+                dtype=dtypes,
+                chunksize=chunksize,
+            )
+            for chunk in reader:
+                if file_type == "payment":
+                    chunk["주문일시"] = parse_order_datetime(chunk["주문일시"])
+                chunks.append(chunk)
+                if progress is not None:
+                    progress(min(buffer.tell() / max(len(raw), 1), 1.0))
+        except UnicodeDecodeError:
+            if i == len(candidates) - 1:
+                raise
+            continue
+        break
+
+    if progress is not None:
+        progress(1.0)
+    if not chunks:
+        return pd.DataFrame({col: pd.Series(dtype=dtypes[col]) for col in columns})
+    return pd.concat(chunks, ignore_index=True)[columns]
+
+def read_upload(raw, file_type, encoding=None, chunksize=CHUNK_SIZE, progress=None):
+    """업로드된 파일(CSV 또는 .xlsx)을 read_csv_upload / read_xlsx_upload 로 읽습니다."""
+    if is_xlsx(raw):
+        return read_xlsx_upload(raw, file_type, chunksize=chunksize, progress=progress)
+    return read_csv_upload(raw, file_type, encoding, chunksize=chunksize, progress=progress)
+
+def _open_workbook(raw):
+    # openpyxl 은 엑셀 업로드에만 필요하므로 쓸 때 불러옵니다.
+    try:
+        from openpyxl import load_workbook
+    except ImportError as exc:
+        raise ImportError("엑셀(.xlsx) 파일을 읽으려면 openpyxl 이 필요합니다. (pip install openpyxl)") from exc
+    # read_only: 시트 전체를 메모리에 올리지 않고 행을 하나씩 읽습니다. data_only: 수식 대신 저장된 값
+    return load_workbook(io.BytesIO(raw), read_only=True, data_only=True)
+
+def _xlsx_header(rows):
+    """
+    행 반복자에서 헤더 행을 찾아 (파일 종류, 헤더 컬럼 목록, 헤더를 읽은 뒤의 rows)를 반환합니다.
+    처음 XLSX_HEADER_SCAN_ROWS 행 안에 필수 컬럼을 모두 가진 행이 없으면 파일 종류는 None 입니다.
+    """
+    for _ in range(XLSX_HEADER_SCAN_ROWS):
+        row = next(rows, None)
+        if row is None:
+            break
+        header = [str(value).strip() if value is not None else "" for value in row]
+        file_type = _file_type(header)
+        if file_type is not None:
+            return file_type, header, rows
+    return None, [], rows
+
+def _cell_text(value):
+    """엑셀 셀 값을 CSV 에서 읽은 것과 같은 문자열로 바꿉니다. (정수 값의 실수 표기와 날짜 형식 통일)"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, datetime):
+        return value.strftime(ORDER_DT_FORMAT if value.time() != datetime.min.time() else "%Y-%m-%d")
+    return str(value)
+
+def _typed_chunk(values, file_type):
+    """필요한 컬럼 값만 담은 행 목록을 read_csv_upload 와 같은 타입의 DataFrame 으로 만듭니다."""
+    columns = payment_columns if file_type == "payment" else member_columns
+    dtypes = payment_dtypes if file_type == "payment" else member_dtypes
+    chunk = pd.DataFrame(values, columns=columns, dtype=object)
+    for col in columns:
+        if file_type == "payment" and col == "주문일시":
+            # 날짜 셀(datetime)은 그대로, 문자열 셀은 CSV 와 같은 방식으로 변환합니다.
+            chunk[col] = parse_order_datetime(chunk[col])
+        elif dtypes[col] == "Int64":
+            chunk[col] = pd.to_numeric(chunk[col], errors="coerce").astype("Int64")
+        else:
+            # 빈 셀은 CSV 와 같이 결측값으로 둡니다. (pandas 3 미만에서는 astype(str) 이 None 을 "None" 문자열로 바꿉니다)
+            text = chunk[col].map(_cell_text)
+            chunk[col] = text.astype(dtypes[col]).where(text.notna())
+    return chunk
+
+def read_xlsx_upload(raw, file_type, chunksize=CHUNK_SIZE, progress=None):
+    """
+    업로드된 .xlsx 바이트(raw)의 첫 시트를 읽기 전용 행 반복자로 읽어, read_csv_upload 와 같은 컬럼·타입의 DataFrame 으로 반환합니다.
+    행마다 필요한 컬럼 값만 남기고 chunksize 행씩 타입을 변환하므로, 시트 전체나 쓰지 않는 컬럼을 메모리에 올리지 않습니다.
+    progress 가 주어지면 읽은 비율(0~1)로 호출합니다.
+    """
+    columns = payment_columns if file_type == "payment" else member_columns
+    dtypes = payment_dtypes if file_type == "payment" else member_dtypes
+    workbook = _open_workbook(raw)
+    chunks = []
+    try:
+        sheet = workbook.active
+        found, header, rows = _xlsx_header(sheet.iter_rows(values_only=True))
+        if found is not None:
+            positions = [header.index(col) for col in columns]
+            # 시트의 dimension 정보가 없으면 max_row 가 None 이므로 진행률은 끝에만 표시합니다.
+            total_rows = sheet.max_row or 0
+            values = []
+            for row_count, row in enumerate(rows, start=1):
+                picked = [row[pos] if pos < len(row) else None for pos in positions]
+                # 서식만 남은 빈 행은 건너뜁니다. (CSV 에는 없는 행)
+                if any(value is not None for value in picked):
+                    values.append(picked)
+                if len(values) == chunksize:
+                    chunks.append(_typed_chunk(values, file_type))
+                    values = []
+                    if progress is not None and total_rows:
+                        progress(min(row_count / total_rows, 1.0))
+            if values:
+                chunks.append(_typed_chunk(values, file_type))
+    finally:
+        workbook.close()
+
+    if progress is not None:
+        progress(1.0)
+    if not chunks:
+        return pd.DataFrame({col: pd.Series(dtype=dtypes[col]) for col in columns})
+    return pd.concat(chunks, ignore_index=True)
@@ -1,6 +1,5 @@
 import streamlit as st
-import pandas as pd
-from utils import init_page
+from utils import init_page, reset_session
 init_page("👤 회원 분석")
 
 
@@ -10,16 +9,12 @@ if "df" not in st.session_state:
 
 # 🔄 초기화 & 업로드 페이지로 이동하는 버튼
 if st.sidebar.button("🔄 다시 업로드하기"):
-    st.session_state.clear()  # 세션 초기화
+    reset_session()  # 세션 초기화 (처리된 데이터는 공유 캐시에 남습니다)
     st.rerun()  # 업로드 페이지로 이동
 st.sidebar.title("📌 메뉴")
 
 st.title("👤 회원 분석 페이지")
 st.info("🚧 회원 분석 기능은 현재 개발 중입니다.")
 
-df = st.session_state["df"]
-
-# 📌 "결제완료" 상태의 주문만 필터링
-df = df[df["이름"] != "관리자"]
-
-st.dataframe(df)
+# 📌 업로드 시 관리자 행을 제외해 둔 프레임을 그대로 표시합니다.
+st.dataframe(st.session_state["df"])
@@ -1,28 +1,48 @@
 import streamlit as st
 import pandas as pd
-import altair as alt
-from streamlit_timeline import st_timeline
-import re
-from datetime import datetime
-import calendar
-
-from events import process_order_row
-from utils import categorize_dday, init_page
-from event_utils import calc_normal_sales_estimate
+import numpy as np
+from datetime import datetime, timedelta
+
+from aggregates import NICEPAY_FEE_RATE, ROYALTY_RATE, SETTLEMENT_RATE, event_summary, monthly_pivot, monthly_totals, top_members
+from branches import ALL_BRANCHES, branch_names
+from cache import shared_cache
+import precompute
+from pipeline import as_of_status, full_event_summary, full_top_members, period_timeline, range_view, uplift_engine
+from timeline import build_timeline, event_background_items, window_timeline
+from profiling import stage
+from schema import display_frame
+from events import CLASSIFIED_COLUMNS
+from utils import cache_handle, init_page, render_profile_panel, reset_session, start_profiling
+from event_utils import event_configs, normal_sales_estimates
+from uplift import UpliftEngine
 init_page("💳 결제 로그 분석")
 
+# 📌 altair / streamlit_timeline / calendar 는 각 페이지 분기 안에서 불러옵니다.
+# 선택한 페이지가 쓰지 않는 차트 라이브러리의 import 비용을 치르지 않습니다.
+
 cols_to_show = [
     "구분", "이름", "주문명", "합계금액", "결제구분", "주문유형", "주문일시",
     "시간", "기간", "상품 유형", "이벤트명", "시작일", "종료일", "남은일수", "D-Day", "만료여부"
 ]
 
+# 📌 페이지별로 필요한 파생 컬럼 (처음 필요할 때만 계산하고 이후에는 재사용합니다)
+# 매출/월별 통계/회원별 결제 금액 페이지는 원본 컬럼만 사용하므로 이벤트 분류를 하지 않습니다.
+PAGE_COLUMNS = {
+    "📈 매출": [],
+    "📊 월별 통계": [],
+    "🎉 이벤트 현황": CLASSIFIED_COLUMNS,
+    "📅 기간권": ["시작일", "종료일"],
+    "🏆 회원별 결제 금액": [],
+    "데이터 보기": CLASSIFIED_COLUMNS,
+}
+
 if "df" not in st.session_state:
     st.warning("🚨 먼저 홈에서 파일을 업로드해주세요.")
     st.stop()
 
 # 🔄 **초기화 & 업로드 페이지로 이동하는 버튼**
 if st.sidebar.button("🔄 다시 업로드하기"):
-    st.session_state.clear()  # 세션 초기화
+    reset_session()  # 세션 초기화 (처리된 데이터는 공유 캐시에 남습니다)
     st.rerun()  # 업로드 페이지로 이동
 
 # 📌 사이드바에서 페이지 선택
@@ -33,40 +53,93 @@ page = st.sidebar.radio(
 )
 
 
-df = st.session_state["df"]
-
-# 날짜 변환
-df["주문일시"] = pd.to_datetime(df["주문일시"], errors="coerce")
-
-# 📌 "결제완료" 상태의 주문만 필터링 (copy()로 명시적 복사하여 SettingWithCopyWarning 방지)
-df_paid = df[(df["주문상태"] == "결제완료") & (df["이름"] != "관리자")].copy()
-
-# SettingWithCopy 경고를 피하기 위해 df_paid 자체에 apply 적용 후 결과를 대입합니다.
-df_paid.loc[:, [
-    "시간", "기간", "상품 유형", "이벤트명", "시작일", "종료일", "남은일수", "D-Day", "만료여부"
-]] = df_paid.apply(process_order_row, axis=1)
+# ⏱️ 성능 측정 (사이드바 토글로 켜고 끕니다)
+start_profiling()
+
+# 🏢 여러 지점의 결제 로그를 올린 경우에만 지점 선택 상자를 보여줍니다.
+# 지점 목록은 업로드 때 데이터셋과 함께 계산해 둔 것을 쓰고, 없으면 한 번만 계산해 세션에 보관합니다.
+if st.session_state.get("branches") is None:
+    st.session_state["branches"] = branch_names(st.session_state["df"])
+branches = st.session_state["branches"]
+branch = ALL_BRANCHES
+if len(branches) > 1:
+    branch = st.sidebar.selectbox("🏢 지점", [ALL_BRANCHES, *branches], key="branch")
+
+# 📌 업로드 파일 해시 + 이벤트/가격 설정 해시 + 지점으로 처리 결과를 캐시합니다.
+# 위젯 클릭으로 재실행될 때는 파싱·분류 없이 캐시된 결과를 사용하고, 남은일수/만료여부는 필요한 곳에서 as_of_status 로 가져옵니다.
+# 업로드 때 지점별로 만들어 둔 큐브가 있으면 다시 집계하지 않습니다.
+# 캐시는 프로세스 전체에서 공유하므로 같은 파일을 연 다른 세션(브라우저 탭)과 결과를 함께 씁니다.
+# 업로드 직후 백그라운드에서 계산 중이면 그 계산이 끝나기를 기다립니다.
+file_hash = st.session_state.get("file_hash")
+with stage("데이터 준비"), st.spinner("⏳ 데이터를 준비하는 중입니다..."):
+    data = precompute.prepared(
+        st.session_state["df"], file_hash, st.session_state.get("branch_cubes"), branch, handle=cache_handle()
+    )
+    # 📌 다른 페이지의 결과도 백그라운드에서 미리 계산합니다. (이미 시작됐으면 그대로 둡니다)
+    precompute.warm(data, precompute.data_key(file_hash, branch))
+    df_paid = data["derived"].require(PAGE_COLUMNS[page])
+
+def wait_precomputed(name):
+    """백그라운드에서 아직 계산 중인 결과면 스피너를 보여 주며 기다립니다."""
+    if not precompute.is_ready(data, name):
+        with st.spinner(f"⏳ {name} 결과를 준비하는 중입니다..."):
+            precompute.wait_for(data, name)
+
+name_index = data["name_index"]
+
+# 💾 업로드 시 타입 변환으로 줄어든 메모리
+memory_report = st.session_state.get("memory_report")
+if memory_report:
+    st.sidebar.caption(
+        f"💾 메모리 {memory_report['before'] / 2**20:,.1f}MB → {memory_report['after'] / 2**20:,.1f}MB"
+    )
+# 🗄️ 모든 세션이 함께 쓰는 공유 캐시 사용량
+cache_stats = shared_cache().stats()
+st.sidebar.caption(
+    f"🗄️ 공유 캐시 {cache_stats['entries']}개 (사용 중 {cache_stats['in_use']}개) · {cache_stats['nbytes'] / 2**20:,.1f}MB"
+)
 
-# 📌 데이터의 첫 주문일시 & 마지막 주문일시 감지
-min_date = df["주문일시"].min().date() if not df["주문일시"].isna().all() else None
-max_date = df["주문일시"].max().date() if not df["주문일시"].isna().all() else None
+# 📌 데이터의 첫 주문일시 & 마지막 주문일시
+min_date = data["min_date"]
+max_date = data["max_date"]
 
 # 📌 데이터 기간 + 현재 날짜 기준 필터링 안내 추가
 if min_date and max_date:
     st.info(f"📆 **이 데이터는 {min_date}부터 {max_date}까지의 결제 내역입니다. 기간 내의 데이터만 집계됩니다.** ")
 
-# 📌 주문명에서 날짜 추출 함수
-def extract_dates(order_name):
-    match = re.search(r"(\d{4}-\d{2}-\d{2})[^\d]+(\d{4}-\d{2}-\d{2})", order_name)
-    if match:
-        return match.group(1), match.group(2)
-    return None, None
+# 📆 조회 기간 (모든 페이지 공통)
+# 주문 행은 주문일시 정렬 인덱스로, 매출 집계는 일별 누적합으로 잘라내므로 기간을 바꿔도 전체를 다시 훑지 않습니다.
+range_start, range_end = min_date, max_date
+if min_date and max_date and min_date < max_date:
+    range_start, range_end = st.sidebar.slider(
+        "📆 조회 기간", min_value=min_date, max_value=max_date, value=(min_date, max_date), format="YYYY-MM-DD", key="date_range"
+    )
+full_range = (range_start, range_end) == (min_date, max_date)
+if not full_range:
+    st.caption(f"🔎 조회 기간: {range_start} ~ {range_end}")
+
+# 전체 df_paid 기준 행 위치 중 조회 기간 안의 것 (전체 기간이면 None)
+range_rows = None if full_range else data["time_index"].rows(range_start, range_end)
+df_full = df_paid
+if range_rows is not None:
+    df_paid = df_full.iloc[range_rows]
+# 조회 기간의 매출 집계 (전체 기간이면 캐시된 집계 그대로)
+view = data if full_range else range_view(data, range_start, range_end)
+
+def rows_in_range(positions):
+    """전체 df_paid 기준 행 위치 중 조회 기간 안의 것만 남깁니다."""
+    return positions if range_rows is None else np.intersect1d(positions, range_rows, assume_unique=True)
 
 # 📅 이용 내역 페이지 (기간권 / 사물함)
 if page == "📅 기간권":
+    import altair as alt
+    from streamlit_timeline import st_timeline
+
     st.title(f"📅 기간권 이용 내역")
     st.caption("💡 타임라인 속 각 항목을 클릭하면 왼쪽에서 상세한 결제 정보를 확인할 수 있습니다.")
-    # 📅 현재 날짜
+    # 📅 현재 날짜 & 기준일 (과거 날짜를 고르면 다시 분류하지 않고 그날 기준의 남은일수/만료 상태를 보여 줍니다)
     today = datetime.today().date()
+    as_of = st.sidebar.date_input("📅 기준일", value=today, key="as_of_date")
 
     # 📌 사용자별 한 줄 표시를 고정하고, 관련 체크박스를 제거했습니다.
     show_expired = st.sidebar.checkbox("만료된 기간권 보기", value=False)
@@ -74,111 +147,95 @@ if page == "📅 기간권":
     search_name = st.sidebar.text_input("🔍 회원 검색 (이름 입력)", "")
 
 
-    # 📌 타임라인 데이터 생성 (만료된 데이터 선택적으로 제외)
-    timeline_df = df_paid[df_paid["구분"] == "기간권"].copy()
-
-    # 📌 🔍 검색어가 입력되면 해당 이름이 포함된 데이터만 필터링
+    # 📌 🔍 검색어가 입력되면 이름 인덱스로 해당 회원의 주문만 가져옵니다. (부분/초성 검색 지원)
+    # 기간권 주문의 행 위치는 캐시에 있으므로, 검색 결과와 교집합만 구해 한 번에 슬라이스합니다.
+    period_rows = rows_in_range(data["period_rows"])
     if search_name:
-        timeline_df = timeline_df[timeline_df["이름"].str.contains(search_name, case=False, na=False)]
-
-    timeline_events = []
-
-    # 📌 D-Day 데이터 저장
-    dday_counts = {}  # D-Day별 인원수 저장
-    future_count = 0   # D-Day가 0 이상인 회원 수
-    valid_users = set()  # ✅ 실제 타임라인 이벤트가 있는 사용자만 저장
-
-    for _, row in timeline_df.iterrows():
-        start_date, end_date = extract_dates(row["주문명"])
-
-        if start_date and end_date:
-            start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
-            end_date_obj = datetime.strptime(end_date, "%Y-%m-%d").date()
-
-            # ✅ 기간권 주 수 계산
-            weeks = ((end_date_obj - start_date_obj).days + 1) // 7
-
-            # ✅ D-Day 계산
-            d_day_value = (end_date_obj - today).days
-            d_day = f"D+{abs(d_day_value)}" if d_day_value < 0 else f"D-{d_day_value}"
-
-            # ✅ D-Day가 0 이상인 회원 수 카운트
-            if d_day_value >= 0:
-                future_count += 1
-                # ✅ D-Day별 인원수 저장
-                if d_day_value not in dday_counts:
-                    dday_counts[d_day_value] = 0
-                dday_counts[d_day_value] += 1
-
-            # ✅ 만료된 기간권 필터링
-            if show_expired or end_date_obj >= today:
-                event = {
-                    "id": int(row["No"]),
-                    "name": row["이름"],
-                    "content": f"{row['이름']}: {weeks}주 ({d_day})",  
-                    "start": start_date,
-                    "end": end_date,
-                    "d_day_value": d_day_value,
-                    "weeks" : weeks,
-                    "style": "background-color: pink; color: black; border-color: red" if end_date_obj < today else "background-color: #caf0f8; color: black; border-color: #caf0f8"
-                }
-                timeline_events.append(event)
-                valid_users.add(row["이름"])  # ✅ 실제 표시할 데이터가 있는 사용자만 그룹으로 포함
-
-    # ✅ D-Day 값이 작은 순으로 이벤트 정렬 (남은 기간이 적은 회원이 위쪽에 보이도록)
-    timeline_events.sort(key=lambda x: x["d_day_value"])
-
-    if valid_users:
-        # ✅ 사용자별 최소 D-Day 값을 기준으로 그룹을 정렬
-        user_min_dday = {}
-        for ev in timeline_events:
-            user_min_dday[ev["name"]] = min(user_min_dday.get(ev["name"], float("inf")), ev["d_day_value"])
-
-        # D-Day 오름차순으로 사용자 정렬
-        sorted_users = sorted(user_min_dday.items(), key=lambda x: x[1])
-
-        groups = [{"id": idx, "content": name} for idx, (name, _) in enumerate(sorted_users)]
-        user_id_map = {g["content"]: g["id"] for g in groups}  # ✅ 사용자 이름 → ID 매핑
-
-        for event in timeline_events:
-            event["group"] = user_id_map[event["name"]]  # ✅ 그룹 ID 적용
-    else:
-        groups = []
-
-    # ✨ 이벤트 기간(background) 추가 표시
-    from event_utils import event_configs
-    for evt_name, config in event_configs.items():
-        evt_start = config["이벤트기간"][0].date().isoformat()
-        evt_end = config["이벤트기간"][1].date().isoformat()
-        timeline_events.append({
-            "id": f"event_{evt_name}",
-            "content": evt_name,
-            "start": evt_start,
-            "end": evt_end,
-            "type": "background",
-            "style": "background-color: rgba(144, 224, 239, 0.15);"
-        })
+        period_rows = np.intersect1d(name_index.search(search_name), period_rows, assume_unique=True)
+    timeline_df = df_full.iloc[period_rows]
+
+    # 📌 타임라인 항목, 그룹, D-Day 집계를 이미 분류된 시작일/종료일 컬럼으로 한 번에 계산
+    # (전체 기간 · 검색어 없는 기본 화면은 업로드 직후 백그라운드에서 미리 계산됩니다)
+    with stage(f"{page} · 집계"):
+        if full_range and not search_name:
+            wait_precomputed("기간권 타임라인")
+            timeline_model = period_timeline(data, as_of, show_expired)
+        else:
+            timeline_model = build_timeline(timeline_df, as_of, show_expired)
+    future_count = timeline_model["future_count"]
+
+    # 📌 타임라인 표시 범위: 보이는 기간 + 회원 페이지만 브라우저로 보냅니다.
+    st.sidebar.divider()
+    st.sidebar.subheader("🗓️ 타임라인 표시 범위")
+    # 적용 중인 표시 기간은 위젯과 별도의 키(timeline_range)에 둡니다. 달력에서 날짜를 하나만 고른 동안에는
+    # 위젯 값이 (시작일,) 이므로 직전 기간을 그대로 사용합니다. 기준일이 바뀌면 표시 기간도 기준일 주변으로 옮깁니다.
+    if "timeline_range" not in st.session_state or st.session_state.get("timeline_as_of") != as_of:
+        st.session_state["timeline_range"] = (as_of - timedelta(days=28), as_of + timedelta(days=56))
+        st.session_state["timeline_as_of"] = as_of
+        st.session_state.pop("timeline_window", None)
+    selected_window = st.session_state.get("timeline_window", ())
+    if len(selected_window) == 2:
+        st.session_state["timeline_range"] = tuple(selected_window)
+    window_start, window_end = st.session_state["timeline_range"]
+    window_length = window_end - window_start
+
+    # ⏪ / ⏩ 버튼으로 표시 기간을 기간 길이만큼 이동
+    pan_prev, pan_next = st.sidebar.columns(2)
+    if pan_prev.button("⏪ 이전 기간", use_container_width=True):
+        window_start, window_end = window_start - window_length, window_end - window_length
+        st.session_state.pop("timeline_window", None)
+    if pan_next.button("다음 기간 ⏩", use_container_width=True):
+        window_start, window_end = window_start + window_length, window_end + window_length
+        st.session_state.pop("timeline_window", None)
+    st.session_state["timeline_range"] = (window_start, window_end)
+    # 다른 페이지에 다녀와 위젯 값이 지워졌거나 기간을 옮겼으면 적용 중인 기간으로 위젯을 채웁니다.
+    if "timeline_window" not in st.session_state:
+        st.session_state["timeline_window"] = (window_start, window_end)
+
+    st.sidebar.date_input("표시 기간", key="timeline_window")
+    page_size = st.sidebar.selectbox("한 페이지에 표시할 회원 수", [20, 50, 100], index=1)
+
+    page_prev, page_next = st.sidebar.columns(2)
+    timeline_page = st.session_state.get("timeline_page", 0)
+    if page_prev.button("◀ 이전 회원", use_container_width=True):
+        timeline_page -= 1
+    if page_next.button("다음 회원 ▶", use_container_width=True):
+        timeline_page += 1
+
+    with stage(f"{page} · 집계"):
+        windowed = window_timeline(timeline_model, window_start, window_end, timeline_page, page_size)
+    st.session_state["timeline_page"] = windowed["page"]
+    timeline_events = windowed["items"]
+    groups = windowed["groups"]
+    st.sidebar.caption(f"회원 페이지 {windowed['page'] + 1} / {windowed['page_count']}")
 
     # 📌 D-Day가 0 이상인 회원 수 표시
-    st.metric("기간 남은 회원 수", f"{future_count} 명")
+    st.metric("기간 남은 회원 수" if as_of == today else f"기간 남은 회원 수 ({as_of} 기준)", f"{future_count} 명")
 
     # 📌 타임라인 표시
     if timeline_events:
-        # ℹ️ 타임라인 높이를 2배(1200px)로 늘리고, 이벤트 기간(background)도 함께 표시합니다.
-        timeline = st_timeline(
-            timeline_events,
-            groups=groups,
-            options={'orientation': 'top'},
-            height="1000px"
-        )
+        # ✨ 표시 기간과 겹치는 이벤트 기간(background)만 함께 표시합니다.
+        with stage(f"{page} · 차트"):
+            timeline = st_timeline(
+                timeline_events + event_background_items(event_configs, window_start, window_end),
+                groups=groups,
+                options={
+                    "orientation": "top",
+                    "start": window_start.isoformat(),
+                    "end": window_end.isoformat(),
+                },
+                height=f"{min(max(len(groups) * 40 + 100, 300), 1000)}px"
+            )
 
         if timeline:
             selected_id = timeline["id"]
-            # 이벤트 기간(background) 등 정수가 아닌 ID는 무시
+            selected_row = pd.DataFrame()
+            # 항목 ID 는 결제 프레임의 행 라벨입니다. 이벤트 기간(background) 등 정수가 아닌 ID는 무시
             if isinstance(selected_id, int):
-                selected_row = df_paid[df_paid["No"] == selected_id]
-            else:
-                selected_row = pd.DataFrame()
+                # 상세 정보에는 이벤트 분류 컬럼도 필요합니다.
+                df_paid = data["derived"].require(CLASSIFIED_COLUMNS)
+                if selected_id in df_paid.index:
+                    selected_row = df_paid.loc[[selected_id]]
 
             if not selected_row.empty:
                 selected_row = selected_row.iloc[0]
@@ -186,7 +243,7 @@ if page == "📅 기간권":
 
                 # 📌 사이드바에 선택된 항목 정보 표시
                 st.sidebar.subheader("📌 선택된 항목 상세 정보")
-                st.sidebar.markdown(f"### 🆔 No: {selected_id}")
+                st.sidebar.markdown(f"### 🆔 No: {selected_row['No']}")
                 st.sidebar.markdown(f"**👤 이름:** {selected_row['이름']}")
                 st.sidebar.markdown(f"**📅 기간:** {selected_event['weeks']}주")
                 st.sidebar.markdown(f"**💰 합계금액:** {int(selected_row['합계금액']):,} 원")
@@ -202,27 +259,12 @@ if page == "📅 기간권":
             else:
                 st.sidebar.warning("🚨 선택한 주문 정보를 찾을 수 없습니다.")
     else:
-        st.warning(f"🚨 현재 유효한 기간권 이용 내역이 없습니다.")
+        st.warning(f"🚨 표시 기간에 유효한 기간권 이용 내역이 없습니다.")
     
 
 
-    # 📌 D-Day 구간별 카운트 저장
-    dday_binned_counts = {}
-
-    for d_day_value, count in dday_counts.items():
-        bin_label = categorize_dday(d_day_value)  # ✅ D-Day를 5명 단위로 그룹화
-        if bin_label not in dday_binned_counts:
-            dday_binned_counts[bin_label] = 0
-        dday_binned_counts[bin_label] += count
-
-    # 📌 D-Day 히스토그램 데이터프레임 생성 (정렬 순서 추가)
-    dday_hist_df = pd.DataFrame(list(dday_binned_counts.items()), columns=["D-Day Group", "Count"])
-
-    # ✅ D-Day 그룹을 올바른 순서로 정렬하기 위한 순서 지정
-    dday_hist_df["Sort Order"] = dday_hist_df["D-Day Group"].map({
-        "0~4": 1, "5~9": 2, "10~14": 3, "15~19": 4, "20~24": 5, "25~29": 6, "30+": 7
-    })
-    dday_hist_df = dday_hist_df.sort_values("Sort Order")  # ✅ 숫자 순서대로 정렬
+    # 📌 D-Day 구간별 히스토그램 데이터 (구간 순서대로 정렬됨)
+    dday_hist_df = timeline_model["dday_hist"]
 
     # 📌 D-Day 히스토그램 그래프
     st.subheader("📊 남은 기간별 회원 수")
@@ -232,21 +274,23 @@ if page == "📅 기간권":
         tooltip=["D-Day Group", "Count"]
     ).properties(width=800, height=400)
 
-    st.altair_chart(chart)
+    with stage(f"{page} · 차트"):
+        st.altair_chart(chart)
 
 # 📈 매출 페이지
 elif page == "📈 매출":
+    import altair as alt
 
     # 총 매출 (결제완료된 주문만 포함)
     st.title("📈 매출 현황")
-    total_sales = df_paid["합계금액"].sum()
-    nicepay_fee = total_sales * 0.033
-    royalty_fee = total_sales * 0.05
+    total_sales = view["total_sales"]
+    nicepay_fee = total_sales * NICEPAY_FEE_RATE
+    royalty_fee = total_sales * ROYALTY_RATE
     final_amount = total_sales - nicepay_fee - royalty_fee
     col1, col2 = st.columns(2)
     col1.metric("💰 총 매출 (결제완료)", f"{total_sales:,.0f} 원")
-    col2.metric("💳 3.3% 나이스페이 수수료", f"-{nicepay_fee:,.0f} 원")
-    col1.metric("🏛️ 5% 로열티", f"-{royalty_fee:,.0f} 원")
+    col2.metric(f"💳 {NICEPAY_FEE_RATE:.1%} 나이스페이 수수료", f"-{nicepay_fee:,.0f} 원")
+    col1.metric(f"🏛️ {ROYALTY_RATE:.0%} 로열티", f"-{royalty_fee:,.0f} 원")
     col2.metric("✅ 최종 정산 금액", f"{final_amount:,.0f} 원")
     
     # 📌 "구분"별 매출 표시
@@ -254,7 +298,7 @@ elif page == "📈 매출":
     st.subheader("📌 종류별 매출 현황")
     
     # 📌 "구분"별 매출 계산
-    category_sales = df_paid.groupby("구분")["합계금액"].sum()  
+    category_sales = view["category_sales"]
     col3, col4 = st.columns(2)
     for idx, (category, sales) in enumerate(category_sales.items()):
         if idx % 2 == 0:
@@ -276,15 +320,14 @@ elif page == "📈 매출":
     ).properties(width=500, height=400)
 
     # 📌 차트 표시 (파이 차트 + 퍼센트 값)
-    st.altair_chart(pie_chart)
+    with stage(f"{page} · 차트"):
+        st.altair_chart(pie_chart)
     
     # 📌 일별 매출 추이
     st.subheader("📈 일별 매출 추이")
     
-    # 일별 매출 계산
-    daily_sales = df_paid.groupby(df_paid["주문일시"].dt.date)["합계금액"].sum().reset_index()
-    daily_sales.columns = ["날짜", "매출"]
-    daily_sales["날짜"] = pd.to_datetime(daily_sales["날짜"])
+    # 일별 매출 (캐시된 집계)
+    daily_sales = view["daily_sales"]
     
     # 일별 매출 차트
     daily_chart = alt.Chart(daily_sales).mark_line(point=True).encode(
@@ -293,56 +336,53 @@ elif page == "📈 매출":
         tooltip=["날짜:T", "매출:Q"]
     ).properties(width=800, height=400)
     
-    st.altair_chart(daily_chart)
+    with stage(f"{page} · 차트"):
+        st.altair_chart(daily_chart)
 
 
 # 📊 월별 통계 페이지
 elif page == "📊 월별 통계":
-    st.title("📊 월별 통계")
-
-    # 📌 월별 데이터 준비
-    df_paid["연월"] = df_paid["주문일시"].dt.to_period("M")
+    import altair as alt
+    import calendar
 
-    # 📌 월별 통계 계산 (원본 "구분" 컬럼 사용)
-    monthly_stats = df_paid.groupby(["연월", "구분"]).agg({
-        "합계금액": ["sum", "count"]
-    }).reset_index()
+    st.title("📊 월별 통계")
 
-    # 컬럼명 정리
-    monthly_stats.columns = ["연월", "구분", "매출", "건수"]
-    monthly_stats["연월_str"] = monthly_stats["연월"].astype(str)
+    # 📌 월별 통계 (원본 "구분" 컬럼 기준, 캐시된 집계)
+    monthly_stats = view["monthly_stats"]
 
     # 📌 필터링 옵션
     st.sidebar.subheader("📌 월별 통계 옵션")
 
     # 연도 선택만 유지
-    years = sorted(df_paid["주문일시"].dt.year.unique())
+    cube = view["cube"]
+    years = sorted(cube["연월"].dropna().dt.year.unique())
     selected_year = st.sidebar.selectbox("📅 연도 선택", ["전체"] + list(years))
 
     if selected_year != "전체":
         monthly_stats = monthly_stats[monthly_stats["연월"].dt.year == selected_year]
-        df_filtered = df_paid[df_paid["주문일시"].dt.year == selected_year]
+        cube_filtered = cube[cube["연월"].dt.year == selected_year]
     else:
-        df_filtered = df_paid
+        cube_filtered = cube
 
     # 📌 월별 총 매출 계산 (매출 추이 그래프용)
-    monthly_total = monthly_stats.groupby("연월_str")["매출"].sum().reset_index()
-    monthly_total["최종정산금액"] = monthly_total["매출"] * 0.912  # 8.8% 수수료 제외
+    with stage(f"{page} · 집계"):
+        monthly_total = monthly_stats.groupby("연월_str")["매출"].sum().reset_index()
+    monthly_total["최종정산금액"] = monthly_total["매출"] * SETTLEMENT_RATE  # 수수료·로열티 제외 (aggregates.monthly_settlement 와 같은 비율)
 
     # 📌 현재 월 예상 매출 및 실제 매출 계산
     today = datetime.today()
     current_year_month_str = today.strftime("%Y-%m")
     current_period = pd.Period(current_year_month_str)
-    current_month_df = df_filtered[df_filtered["주문일시"].dt.to_period("M") == current_period]
+    current_month_cube = cube_filtered[cube_filtered["연월"] == current_period]
 
     current_actual_point = None
-    if not current_month_df.empty:
-        current_sales = current_month_df["합계금액"].sum()
+    if not current_month_cube.empty:
+        current_sales = current_month_cube["매출"].sum()
         elapsed_days = today.day
         total_days_in_month = calendar.monthrange(today.year, today.month)[1]
         if elapsed_days > 0:
             predicted_sales = (current_sales / elapsed_days) * total_days_in_month
-            predicted_settlement = predicted_sales * 0.912
+            predicted_settlement = predicted_sales * SETTLEMENT_RATE
 
             if (monthly_total["연월_str"] == current_year_month_str).any():
                 monthly_total.loc[monthly_total["연월_str"] == current_year_month_str, "매출"] = predicted_sales
@@ -417,7 +457,8 @@ elif page == "📊 월별 통계":
         else:
             trend_chart = trend_chart_base.properties(width=800, height=400, title="월별 매출 및 최종 정산 금액 추이")
 
-        st.altair_chart(trend_chart)
+        with stage(f"{page} · 차트"):
+            st.altair_chart(trend_chart)
         st.caption("💡 실선은 월말까지의 예상 매출·정산 금액이고, 빨간 점은 오늘까지의 실제 누적 매출입니다.")
         
         # 📊 월별 매출 요약 통계
@@ -446,7 +487,8 @@ elif page == "📊 월별 통계":
             tooltip=["연월_str:N", "구분:N", "매출:Q", "건수:Q"]
         ).properties(width=800, height=400, title="월별 매출")
 
-        st.altair_chart(revenue_chart)
+        with stage(f"{page} · 차트"):
+            st.altair_chart(revenue_chart)
         
         # 📊 월별 판매 건수 그래프
         st.subheader("📊 월별 판매 건수")
@@ -472,104 +514,73 @@ elif page == "📊 월별 통계":
                 tooltip=["연월_str:N", "구분:N", "건수:Q", "매출:Q"]
             ).properties(width=800, height=400, title="월별 판매 건수")
             
-            st.altair_chart(count_chart)
+            with stage(f"{page} · 차트"):
+                st.altair_chart(count_chart)
 
         # 📋 표: 월별 총 금액 및 항목별 월별 합계 (구분/결제구분/주문유형)
         st.subheader("📋 월별 합계 표")
-        df_month = df_filtered.copy()
-        df_month["연월"] = df_month["주문일시"].dt.to_period("M")
-        df_month["연월_str"] = df_month["연월"].astype(str)
-
         # 1) 월별 총 금액
-        monthly_total_table = (
-            df_month.groupby("연월_str")["합계금액"]
-            .sum()
-            .reset_index()
-            .rename(columns={"연월_str": "연월", "합계금액": "총 금액"})
-            .sort_values("연월")
-        )
+        with stage(f"{page} · 집계"):
+            monthly_total_table = monthly_totals(cube_filtered)
         st.markdown("#### 🧾 월별 총 금액")
-        st.dataframe(
-            monthly_total_table.style.format({"총 금액": "{:,.0f}"}),
-            use_container_width=True
-        )
+        with stage(f"{page} · 표"):
+            st.dataframe(
+                monthly_total_table.style.format({"총 금액": "{:,.0f}"}),
+                use_container_width=True
+            )
 
         # 2) 구분별 월별 합계 금액 (예: 1회시간권, 사물함, 정액시간권, 기간권 등)
-        monthly_by_category = (
-            df_month.pivot_table(
-                index="연월_str",
-                columns="구분",
-                values="합계금액",
-                aggfunc="sum",
-                fill_value=0,
-            )
-            .reset_index()
-            .rename(columns={"연월_str": "연월"})
-            .sort_values("연월")
-        )
+        with stage(f"{page} · 집계"):
+            monthly_by_category = monthly_pivot(cube_filtered, "구분")
         st.markdown("#### 🗂️ 구분별 월별 합계 금액")
         _num_cols_cat = monthly_by_category.select_dtypes(include="number").columns
-        st.dataframe(monthly_by_category.style.format({c: "{:,.0f}" for c in _num_cols_cat}), use_container_width=True)
+        with stage(f"{page} · 표"):
+            st.dataframe(monthly_by_category.style.format({c: "{:,.0f}" for c in _num_cols_cat}), use_container_width=True)
 
         # 3) 결제구분별 월별 합계 금액 (예: 카드, 현금)
-        monthly_by_payment = (
-            df_month.pivot_table(
-                index="연월_str",
-                columns="결제구분",
-                values="합계금액",
-                aggfunc="sum",
-                fill_value=0,
-            )
-            .reset_index()
-            .rename(columns={"연월_str": "연월"})
-            .sort_values("연월")
-        )
+        with stage(f"{page} · 집계"):
+            monthly_by_payment = monthly_pivot(cube_filtered, "결제구분")
         st.markdown("#### 💳 결제구분별 월별 합계 금액")
         _num_cols_pay = monthly_by_payment.select_dtypes(include="number").columns
-        st.dataframe(monthly_by_payment.style.format({c: "{:,.0f}" for c in _num_cols_pay}), use_container_width=True)
+        with stage(f"{page} · 표"):
+            st.dataframe(monthly_by_payment.style.format({c: "{:,.0f}" for c in _num_cols_pay}), use_container_width=True)
 
         # 4) 주문유형별 월별 합계 금액 (예: 키오스크, 운영PC, 앱)
-        monthly_by_order_type = (
-            df_month.pivot_table(
-                index="연월_str",
-                columns="주문유형",
-                values="합계금액",
-                aggfunc="sum",
-                fill_value=0,
-            )
-            .reset_index()
-            .rename(columns={"연월_str": "연월"})
-            .sort_values("연월")
-        )
+        with stage(f"{page} · 집계"):
+            monthly_by_order_type = monthly_pivot(cube_filtered, "주문유형")
         st.markdown("#### 🛒 주문유형별 월별 합계 금액")
         _num_cols_ord = monthly_by_order_type.select_dtypes(include="number").columns
-        st.dataframe(monthly_by_order_type.style.format({c: "{:,.0f}" for c in _num_cols_ord}), use_container_width=True)
+        with stage(f"{page} · 표"):
+            st.dataframe(monthly_by_order_type.style.format({c: "{:,.0f}" for c in _num_cols_ord}), use_container_width=True)
 
     else:
         st.warning("🚨 선택된 조건에 해당하는 데이터가 없습니다.")
 
 # 🎉 이벤트 현황 페이지
 elif page == "🎉 이벤트 현황":
+    import altair as alt
+
     st.title("🎉 이벤트 현황")
 
     st.caption("🔍 기간권 (2주, 4주 등), 정액시간권(50시간, 100시간 등)만 집계됩니다.")
 
-    # 📌 이벤트별 매출 표시
-    normal_sales = df_paid[df_paid["상품 유형"] == "정가"]["합계금액"].sum()
+    # 📌 이벤트별 매출 집계 (전체 기간이면 업로드 직후 백그라운드에서 미리 계산된 결과)
+    with stage(f"{page} · 집계"):
+        if full_range:
+            wait_precomputed("이벤트 현황")
+            summary = full_event_summary(data)
+        else:
+            summary = event_summary(df_paid)
     col1, col2 = st.columns(2)
 
-    event_df = df_paid[df_paid["이벤트명"].notnull()]
-
-    if not event_df.empty:
-        # 이벤트별 상세 매출 데이터
-        event_sales_detail = event_df.groupby(["이벤트명", "상품 유형"])["합계금액"].sum().reset_index()
-        event_total_sales = event_df.groupby("이벤트명")["합계금액"].sum().reset_index()
+    event_sales_detail = summary["event_sales_detail"]
+    event_total_sales = summary["event_total_sales"]
+    normal_sales = summary["normal_sales"]
 
+    if not event_total_sales.empty:
         # 전체 정가 매출 요약 출력 (한 번만)
-        normal_df = df_paid[df_paid["상품 유형"] == "정가"]
-        if not normal_df.empty:
-            normal_sales = normal_df["합계금액"].sum()
-            total_days = (max_date - min_date).days + 1
+        if normal_sales is not None:
+            total_days = (range_end - range_start).days + 1
             avg_normal_sales_per_day = normal_sales / total_days
             
             with col1:
@@ -577,14 +588,27 @@ elif page == "🎉 이벤트 현황":
             with col2:
                 st.metric("📊 일주일 평균 정가 매출", f"{avg_normal_sales_per_day * 7:,.0f} 원")
 
-        # 이벤트 매출 표시 (delta는 유지)
+        # 📏 기준 매출: 이벤트 직전·직후 N개 비이벤트일의 정가 매출 일평균 (슬라이더를 움직여도 다시 집계하지 않습니다)
+        # 조회 기간을 좁히면 전후 비이벤트일도 조회 기간 안에서만 찾으므로, 표의 모든 기준 매출이 같은 기간을 사용합니다.
+        window_days = st.sidebar.slider("📏 기준 매출 계산 기간 (이벤트 전후 비이벤트 일수)", 7, 90, 28, step=7)
+
+        # 📌 모든 이벤트의 예상 정가 매출을 한 번에 계산 (이벤트 날짜 합집합은 한 번만 계산)
+        with stage(f"{page} · 집계"):
+            estimates = normal_sales_estimates(normal_sales or 0, range_start, range_end)
+            if full_range:
+                engine = uplift_engine(data)
+            else:
+                engine = UpliftEngine(df_paid[df_paid["상품 유형"] == "정가"], range_start, range_end)
+            scores = engine.scores(window_days)
+            # 전후 비이벤트일이 없는 이벤트는 전체 평균 기준 추정을 사용합니다.
+            scores["예상 정가 매출"] = scores["예상 정가 매출"].fillna(estimates["예상 정가 매출"])
+
+        # 이벤트 매출 표시 (delta: 이벤트 매출 - 전후 N일 기준 예상 정가 매출)
         for i, (_, row) in enumerate(event_total_sales.iterrows()):
             event_name = row["이벤트명"]
             actual_event_sales = row["합계금액"]
-
-            estimated_normal_sales, event_duration, _, _ = calc_normal_sales_estimate(
-                event_name, normal_df, min_date, max_date
-            )
+            estimated_normal_sales = scores.at[event_name, "예상 정가 매출"]
+            event_duration = scores.at[event_name, "이벤트 일수"]
 
             target_col = col1 if i % 2 == 0 else col2
             with target_col:
@@ -593,7 +617,19 @@ elif page == "🎉 이벤트 현황":
                     f"{actual_event_sales:,.0f} 원",
                     delta=f"{actual_event_sales - estimated_normal_sales:,.0f} 원"
                 )
-        
+
+        # 📌 이벤트 효과 표 (모든 이벤트를 한 번에 비교)
+        st.subheader(f"📊 이벤트 효과 (전후 {window_days}일 기준 · {range_start} ~ {range_end})")
+        event_sales = event_total_sales.set_index(event_total_sales["이벤트명"].astype(str))["합계금액"]
+        # 조회 기간에 매출이 있는 이벤트만 표시합니다.
+        uplift_table = scores.loc[scores.index.isin(event_sales.index)]
+        uplift_table = uplift_table.join(estimates["예상 정가 매출"].rename("전체 평균 기준 예상"))
+        uplift_table.insert(0, "이벤트 매출", event_sales)
+        uplift_table["증가 매출"] = uplift_table["이벤트 매출"] - uplift_table["예상 정가 매출"]
+        _money_cols = ["이벤트 매출", "일평균 기준 매출", "예상 정가 매출", "전체 평균 기준 예상", "증가 매출"]
+        with stage(f"{page} · 표"):
+            st.dataframe(uplift_table.style.format({c: "{:,.0f}" for c in _money_cols}), use_container_width=True)
+
         # 📌 이벤트별 매출 차트
         st.subheader("📈 이벤트별 매출 비교")
         chart_event = alt.Chart(event_sales_detail).mark_bar().encode(
@@ -605,7 +641,8 @@ elif page == "🎉 이벤트 현황":
                            title="상품 유형"),
             tooltip=["이벤트명", "상품 유형", "합계금액"]
         ).properties(width=800, height=400)
-        st.altair_chart(chart_event)
+        with stage(f"{page} · 차트"):
+            st.altair_chart(chart_event)
 
     else:
         st.warning("🚨 이벤트 매출 데이터가 없습니다.")
@@ -616,24 +653,60 @@ elif page == "🎉 이벤트 현황":
     if not suspected_df.empty:
 
         st.subheader("📋 이벤트 의심 상세 내역")
-        st.dataframe(suspected_df[cols_to_show], use_container_width=True)
+        wait_precomputed("기준일 상태")
+        with stage(f"{page} · 표"):
+            st.dataframe(display_frame(suspected_df.join(as_of_status(data)), cols_to_show), use_container_width=True)
     else:
         st.success("✅ 이벤트 의심 회원이 없습니다.")
 
 elif page == "🏆 회원별 결제 금액":
+    import altair as alt
+
     st.title("🏆 회원별 총 결제 금액 TOP 10")
 
     # 회원별 총 결제 금액 계산
-    top_members = df_paid.groupby("이름")["합계금액"].sum().nlargest(10).reset_index()
+    with stage(f"{page} · 집계"):
+        if full_range:
+            wait_precomputed("회원 TOP 10")
+            top_members_df = full_top_members(data)
+        else:
+            top_members_df = top_members(df_paid)
 
     # Altair 차트 표시 (페이지 높이에 맞게 조정)
-    chart = alt.Chart(top_members).mark_bar(color="skyblue").encode(
+    chart = alt.Chart(top_members_df).mark_bar(color="skyblue").encode(
         x=alt.X("합계금액:Q", title="총 결제 금액 (원)"),
         y=alt.Y("이름:N", sort="-x", title="회원 이름")
     ).properties(width=800, height=600)
 
-    st.altair_chart(chart)
+    with stage(f"{page} · 차트"):
+        st.altair_chart(chart)
+
+    # 📌 🔍 회원 검색: 검색된 회원들의 총 결제 금액
+    search_name = st.sidebar.text_input("🔍 회원 검색 (이름 입력)", "")
+    if search_name:
+        st.subheader(f"🔍 '{search_name}' 검색 결과")
+        matched = df_full.iloc[rows_in_range(name_index.search(search_name))]
+        if matched.empty:
+            st.info("❗ 일치하는 회원이 없습니다.")
+        else:
+            with stage(f"{page} · 집계"):
+                member_totals = (
+                    matched.groupby("이름", observed=True)["합계금액"].agg(["sum", "count"])
+                    .rename(columns={"sum": "총 결제 금액", "count": "결제 건수"})
+                    .sort_values("총 결제 금액", ascending=False)
+                    .reset_index()
+                )
+            with stage(f"{page} · 표"):
+                st.dataframe(member_totals.style.format({"총 결제 금액": "{:,.0f}"}), use_container_width=True)
 
 elif page == "데이터 보기":
 
-    st.write(df_paid[cols_to_show])
\ No newline at end of file
+    # 📌 🔍 회원 검색 (이름 인덱스 사용)
+    search_name = st.sidebar.text_input("🔍 회원 검색 (이름 입력)", "")
+    df_view = df_full.iloc[rows_in_range(name_index.search(search_name))] if search_name else df_paid
+
+    with stage(f"{page} · 표"):
+        st.write(display_frame(df_view.join(as_of_status(data)), cols_to_show))
+
+# ⏱️ 단계별 측정 결과 (측정이 켜져 있을 때만 표시·기록)
+render_profile_panel(page)
@@ -1,16 +1,43 @@
+import hashlib
+
 import streamlit as st
-import pandas as pd
 
-from utils import init_page
+from store import append_payments, has_payments, load_payments, store_version, stored_order_keys
+from profiling import stage, write_log
+from utils import cache_handle, init_page, start_profiling
 init_page("스터디 카페 대시보드")
 
+# 📌 pandas 를 쓰는 처리 모듈(ingest, branches, pipeline 등)은 파일을 처리할 때만 불러옵니다.
+# 파일을 고르기 전의 첫 화면은 streamlit 만으로 그려지므로 앱 시작이 빨라집니다.
+
+def load_stored(version):
+    """저장소 전체(버전 version)를 공유 캐시를 통해 불러옵니다. 같은 버전을 보는 세션은 한 프레임을 함께 씁니다."""
+    from branches import branch_names
+    from event_utils import config_hash
+    from pipeline import canonical_payments
+
+    def read_stored():
+        df = canonical_payments(load_payments())
+        return {"df": df, "branch_cubes": None, "branches": branch_names(df), "before": None}
+
+    # 설정이 바뀌면 load_payments 가 오래된 파트를 다시 분류하므로 설정 해시도 키에 넣습니다.
+    return cache_handle().get_or_compute("df", ("store", version, config_hash()), read_stored)
+
+# ⏱️ 성능 측정 (사이드바 토글로 켜고 끕니다)
+start_profiling()
+
 
 
 st.title("📂 파일 업로드")
 
 # 업로드된 파일을 세션에 저장
-uploaded_file = st.file_uploader("분석할 CSV 파일을 업로드하세요", type=["csv"])
-if uploaded_file is None:
+uploaded_files = st.file_uploader(
+    "분석할 엑셀(.xlsx) 또는 CSV 파일을 업로드하세요 (여러 지점의 결제 로그는 한 번에 여러 개를 올릴 수 있습니다)",
+    type=["xlsx", "csv"],
+    accept_multiple_files=True,
+)
+save_to_store = st.checkbox("💾 결제 로그를 로컬 저장소에 누적 저장하기 (이미 저장된 주문은 건너뜁니다)", value=True)
+if not uploaded_files:
     st.info(
         """
         📢 **엑셀 파일 업로드 안내**
@@ -26,24 +53,112 @@ if uploaded_file is None:
         """
     )
 
-if uploaded_file is not None:
-    df = pd.read_csv(uploaded_file, encoding="euc-kr")
-    st.session_state["df"] = df
+    # 📦 저장소에 누적된 결제 로그가 있으면 업로드 없이 바로 불러올 수 있습니다.
+    if has_payments() and st.button("📦 저장된 결제 로그 불러오기"):
+        import precompute
 
-    # 📌 컬럼 체크: 결제 로그 vs 회원 데이터
-    payment_columns = {"No", "브랜드", "지점", "구분", "이름", "주문명", "주문금액", "할인금액", "합계금액", "결제구분", "주문유형", "주문상태", "주문일시"}
-    member_columns = {"NO", "이름", "생년월일", "성별", "사물함", "신발장", "휴대폰", "PIN번호", "수신", "보호자", "휴대폰2", "수신2", "상태", "이용권", "좌석", "좌석타입", "시작일", "종료일", "잔여", "전체", "이용금액"}
-
-    if payment_columns.issubset(df.columns):
-        st.success("✅ 결제 로그 파일이 감지되었습니다. '💳 결제 로그' 페이지로 이동합니다.")
+        file_hash = store_version()
+        dataset = load_stored(file_hash)
+        st.session_state["df"] = dataset["df"]
+        st.session_state.pop("memory_report", None)
+        st.session_state.pop("branch_cubes", None)
+        st.session_state["branches"] = dataset["branches"]
+        st.session_state["file_hash"] = file_hash
         st.session_state["file_type"] = "payment"
+        precompute.start(st.session_state["df"], file_hash)
         st.rerun()
-    elif member_columns.issubset(df.columns):
-        st.success("✅ 회원 데이터 파일이 감지되었습니다. '👤 회원 분석' 페이지로 이동합니다.")
-        st.session_state["file_type"] = "member"
-        st.rerun()
-    else:
+
+if uploaded_files:
+    import precompute
+    from branches import branch_names, merge_exports, process_exports
+    from cache import shared_cache
+    from event_utils import config_hash
+    from ingest import read_upload, sniff_header
+    from pipeline import canonical_members
+    from schema import frame_nbytes
+
+    raws = [uploaded_file.getvalue() for uploaded_file in uploaded_files]
+
+    # 📌 헤더(첫 줄)만 먼저 읽어 결제 로그 / 회원 데이터를 구분합니다. (엑셀 파일은 첫 시트의 헤더 행)
+    try:
+        sniffed = [sniff_header(raw) for raw in raws]
+    except ImportError as exc:
+        st.error(f"🚨 {exc}")
+        st.stop()
+    file_types = {file_type for file_type, _ in sniffed}
+    file_type = file_types.pop() if len(file_types) == 1 else None
+
+    if None in (file_type, *file_types):
         st.error("🚨 올바른 파일 형식이 아닙니다. 결제 로그 또는 회원 데이터를 업로드하세요.")
         st.session_state["file_type"] = None
+    elif file_type == "member" and len(raws) > 1:
+        st.error("🚨 회원 데이터는 한 번에 한 파일만 업로드할 수 있습니다.")
+        st.session_state["file_type"] = None
+    else:
+        # 📌 파일 내용 해시 (파일 순서와 무관) — 공유 캐시와 처리 결과 캐시의 키로 사용합니다.
+        # 다른 세션에서 같은 파일을 이미 올렸거나 처리 중이면 다시 읽지 않고 그 결과를 사용합니다.
+        digests = sorted(hashlib.sha256(raw).hexdigest() for raw in raws)
+        file_hash = hashlib.sha256("".join(digests).encode("ascii")).hexdigest()
+        progress_bar = st.progress(0.0, text="📥 파일을 읽는 중입니다...")
+        show_progress = lambda done: progress_bar.progress(done, text="📥 파일을 읽는 중입니다...")
+
+        if file_type == "payment":
+            def read_payments(exclude=None):
+                # 📌 결제 로그는 파일마다(여러 개면 프로세스 풀에서 동시에) 읽고 지점별로 나눠 분류·큐브 집계까지 한 뒤 합칩니다.
+                # 분석 대상 행만 남긴 category / int32 / datetime64 프레임 하나만 보관합니다.
+                # exclude 가 주어지면 저장소에 이미 있는 주문은 분류하지 않고 뺍니다.
+                with stage("업로드 · 읽기·분류"):
+                    results = process_exports(
+                        raws, [encoding for _, encoding in sniffed], progress=show_progress, exclude=exclude
+                    )
+                    df, branch_cubes = merge_exports(results)
+                return {
+                    "df": df, "branch_cubes": branch_cubes, "branches": branch_names(df),
+                    "before": sum(raw_nbytes for _, raw_nbytes in results),
+                }
+
+            # 업로드 때 이벤트 분류까지 하므로, 이벤트/가격 설정이 바뀌면 같은 파일도 다시 처리합니다.
+            upload_key = ("upload", file_hash, config_hash())
+            if save_to_store:
+                # 📦 저장소에 없는 새 주문만 분류해 추가한 뒤, 저장소 전체(과거 이력 포함)를 분석합니다.
+                # (매주 겹치는 기간을 다시 올려도 이미 저장된 주문은 다시 분류하지 않습니다)
+                # 새 주문은 저장소 내용에 따라 달라지므로 저장소 버전도 키에 넣습니다.
+                new_key = (*upload_key, store_version())
+                uploaded = shared_cache().get_or_compute(new_key, lambda: read_payments(stored_order_keys()))
+                with stage("업로드 · 저장소"):
+                    added = append_payments(uploaded["df"])
+                    file_hash = store_version()
+                    dataset = {**load_stored(file_hash), "before": uploaded["before"]}
+                st.toast(f"💾 새 주문 {added:,}건을 저장소에 추가했습니다.")
+            else:
+                dataset = cache_handle().get_or_compute("df", upload_key, read_payments)
+        else:
+            def read_members():
+                with stage("업로드 · 읽기"):
+                    df = read_upload(raws[0], file_type, sniffed[0][1], progress=show_progress)
+                with stage("업로드 · 정리"):
+                    return {"df": canonical_members(df), "branch_cubes": None, "before": frame_nbytes(df)}
+
+            dataset = cache_handle().get_or_compute("df", ("members", file_hash), read_members)
+        progress_bar.empty()
+
+        # 📌 변환 전후 메모리는 사이드바에 표시합니다. (세션은 공유 캐시의 프레임을 복사하지 않고 참조만 합니다)
+        st.session_state["memory_report"] = {"before": dataset["before"], "after": frame_nbytes(dataset["df"])}
+        st.session_state["df"] = dataset["df"]
+        st.session_state["file_hash"] = file_hash
+        # 📌 지점별 큐브 (지점 선택 시 큐브를 다시 집계하지 않도록)
+        st.session_state["branch_cubes"] = dataset["branch_cubes"]
+        # 📌 지점 이름 목록 (데이터셋과 함께 한 번만 계산해 두고, 재실행마다 지점 컬럼을 훑지 않도록)
+        st.session_state["branches"] = dataset.get("branches")
+
+        if file_type == "payment":
+            # 📌 결제 로그 페이지의 집계를 지금부터 백그라운드에서 미리 계산합니다.
+            precompute.start(dataset["df"], file_hash, dataset["branch_cubes"])
+            st.success("✅ 결제 로그 파일이 감지되었습니다. '💳 결제 로그' 페이지로 이동합니다.")
+        else:
+            st.success("✅ 회원 데이터 파일이 감지되었습니다. '👤 회원 분석' 페이지로 이동합니다.")
+        st.session_state["file_type"] = file_type
+        write_log({"page": "업로드", "file_hash": file_hash})
+        st.rerun()
 else:
     st.session_state["file_type"] = None
@@ -0,0 +1,152 @@
+import threading
+from datetime import date
+
+import numpy as np
+
+from aggregates import build_daily_cube, category_sales, daily_sales, event_summary, monthly_stats, top_members
+from profiling import stage
+from schema import compact_members, compact_payments
+from search import NameIndex
+from uplift import UpliftEngine
+from daterange import OrderTimeIndex, RangeTotals, slice_days
+from derived import DerivedFrame
+from events import as_of_columns, CLASSIFIED_COLUMNS
+from timeline import build_timeline
+
+# 📌 prepare_payments 결과(data)에 처음 필요할 때 계산해 보관하는 결과의 이름
+MEMO_SLOTS = ["as_of_status", "uplift", "event_summary", "top_members", "period_timeline"]
+
+def canonical_payments(df):
+    """
+    업로드 직후 한 번만 호출해, 세션에 보관할 결제 로그 프레임을 만듭니다.
+    작은 타입으로 변환하고 결제완료 주문(관리자 제외)만 남기며, 주문일시는 datetime64 로 둡니다.
+    결제완료 행을 고를 때 한 번 복사되며, 세션과 페이지는 이 프레임 하나를 함께 참조합니다.
+    (조회 기간·검색으로 고른 행은 페이지가 필요할 때 iloc 로 골라 쓰며, 이때는 고른 행만 복사됩니다)
+    """
+    df = compact_payments(df)
+    order_dt = df["주문일시"]
+    paid = (df["주문상태"] == "결제완료") & (df["이름"] != "관리자")
+    df_paid = df[paid]
+    # 📌 데이터 기간은 취소 주문까지 포함한 전체 업로드 기준으로 기록합니다.
+    # (Parquet 저장 시 attrs 가 JSON 으로 저장되도록 ISO 날짜 문자열로 둡니다. 읽을 때는 order_period 를 사용합니다)
+    has_dates = not order_dt.isna().all()
+    df_paid.attrs["주문기간"] = (
+        (order_dt.min().date().isoformat(), order_dt.max().date().isoformat()) if has_dates else (None, None)
+    )
+    return df_paid
+
+def order_period(df_paid):
+    """canonical_payments 가 기록한 데이터 기간 (첫 주문일, 마지막 주문일) — 날짜가 없으면 (None, None)"""
+    start, end = df_paid.attrs.get("주문기간", (None, None))
+    return (date.fromisoformat(start) if start else None, date.fromisoformat(end) if end else None)
+
+def canonical_members(df):
+    """업로드 직후 한 번만 호출해, 세션에 보관할 회원 데이터 프레임(관리자 제외)을 만듭니다."""
+    df = compact_members(df)
+    return df[df["이름"] != "관리자"]
+
+def prepare_payments(df_paid, cube=None):
+    """
+    canonical_payments 로 만든 결제 로그를 분석용으로 준비합니다.
+    원본 컬럼만 쓰는 페이지 공통 집계만 미리 계산하고, 이벤트 분류 등 파생 컬럼은 derived 에서
+    페이지가 처음 요청할 때 계산합니다. 결과를 그대로 캐시해 두고, 남은일수/만료여부는 as_of_status 로 가져옵니다.
+    지점별로 미리 만든 큐브를 합친 cube 가 있으면 큐브를 다시 집계하지 않고 사용합니다.
+    """
+    min_date, max_date = order_period(df_paid)
+
+    # 📌 페이지 공통 집계 (일 × 구분 × 결제구분 × 주문유형 큐브에서 파생)
+    if cube is None:
+        with stage("큐브 집계"):
+            cube = build_daily_cube(df_paid)
+    with stage("이름 인덱스"):
+        name_index = NameIndex(df_paid["이름"])
+    with stage("기간 인덱스"):
+        time_index = OrderTimeIndex(df_paid["주문일시"])
+        range_totals = RangeTotals(cube)
+
+    return {
+        # 📌 파생 컬럼을 필요할 때 붙여 주는 프레임 (derived.require(컬럼) 으로 사용)
+        "derived": DerivedFrame(df_paid),
+        # 📌 데이터의 첫 주문일시 & 마지막 주문일시
+        "min_date": min_date,
+        "max_date": max_date,
+        "cube": cube,
+        # 📌 회원 검색용 이름 인덱스 (df_paid 행 위치 기준)
+        "name_index": name_index,
+        # 📌 기간권 주문의 행 위치 (기간권 페이지가 재실행마다 마스크를 만들지 않도록)
+        "period_rows": np.flatnonzero(df_paid["구분"] == "기간권"),
+        # 📌 조회 기간 필터용: 주문일시 정렬 인덱스 (df_paid 행 위치 기준) & 일별 누적 매출
+        "time_index": time_index,
+        "range_totals": range_totals,
+        "total_sales": cube["매출"].sum(),
+        "category_sales": category_sales(cube),
+        "daily_sales": daily_sales(cube),
+        "monthly_stats": monthly_stats(cube),
+        # 📌 처음 필요할 때 계산해 보관하는 결과(_memo)의 slot 별 잠금
+        "memo_locks": {slot: threading.Lock() for slot in MEMO_SLOTS},
+    }
+
+def range_view(data, start, end):
+    """
+    조회 기간 [start, end] 의 매출 집계를 prepare_payments 결과와 같은 키(total_sales, category_sales,
+    daily_sales, cube, monthly_stats)로 반환합니다. 누적합과 날짜순 큐브를 잘라 쓰므로 주문 행은 다시 훑지 않습니다.
+    """
+    totals = data["range_totals"]
+    cube = slice_days(data["cube"], start, end)
+    return {
+        "total_sales": totals.total_sales(start, end),
+        "category_sales": totals.category_sales(start, end),
+        "daily_sales": slice_days(data["daily_sales"], start, end),
+        "cube": cube,
+        "monthly_stats": monthly_stats(cube),
+    }
+
+def _memo(data, slot, key, compute):
+    """
+    data[slot] 에 (key, 결과) 로 보관한 결과를 반환하고, 없거나 key 가 다르면 compute() 로 새로 계산합니다.
+    data 는 공유 캐시를 통해 여러 세션과 백그라운드 작업(precompute)이 함께 쓰므로, slot 마다 잠금을 잡고 한 번만 계산합니다.
+    (다른 slot 의 계산은 기다리지 않습니다)
+    """
+    cached = data.get(slot)
+    if cached is None or cached[0] != key:
+        with data["memo_locks"][slot]:
+            cached = data.get(slot)
+            if cached is None or cached[0] != key:
+                cached = (key, compute())
+                data[slot] = cached
+    return cached[1]
+
+def as_of_status(data, as_of=None):
+    """
+    캐시된 결제 로그의 기준일(as_of, 기본 오늘) 기준 남은일수, 만료여부 컬럼(df_paid 와 같은 인덱스)을 반환합니다.
+    분류 결과는 건드리지 않으며, 마지막으로 계산한 기준일과 같으면 새로 계산하지 않습니다.
+    """
+    as_of = as_of or date.today()
+    return _memo(data, "as_of_status", as_of, lambda: as_of_columns(data["derived"].require(["종료일"])["종료일"], as_of))
+
+def uplift_engine(data):
+    """이벤트 현황 페이지의 기준 매출 엔진 (처음 필요할 때 만들어 캐시된 data 에 보관합니다)"""
+    def build():
+        df_paid = data["derived"].require(["상품 유형"])
+        return UpliftEngine(df_paid[df_paid["상품 유형"] == "정가"], data["min_date"], data["max_date"])
+    return _memo(data, "uplift", None, build)
+
+def full_event_summary(data):
+    """전체 기간의 이벤트 현황 집계 (aggregates.event_summary, 처음 필요할 때 만들어 캐시된 data 에 보관합니다)"""
+    return _memo(data, "event_summary", None, lambda: event_summary(data["derived"].require(CLASSIFIED_COLUMNS)))
+
+def full_top_members(data):
+    """전체 기간의 회원별 총 결제 금액 TOP 10 (처음 필요할 때 만들어 캐시된 data 에 보관합니다)"""
+    return _memo(data, "top_members", None, lambda: top_members(data["derived"].frame))
+
+def period_timeline(data, as_of=None, show_expired=False):
+    """
+    전체 기간 · 검색어 없는 기간권 타임라인 모델 (timeline.build_timeline).
+    기간권 페이지를 처음 열 때의 기본 화면이며, 마지막으로 계산한 (기준일, 만료 표시)와 같으면 새로 계산하지 않습니다.
+    """
+    key = (as_of or date.today(), show_expired)
+
+    def build():
+        df_paid = data["derived"].require(["시작일", "종료일"])
+        return build_timeline(df_paid.iloc[data["period_rows"]], key[0], show_expired)
+    return _memo(data, "period_timeline", key, build)
@@ -0,0 +1,89 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from branches import ALL_BRANCHES, select_branch
+from cache import estimate_nbytes, shared_cache
+from event_utils import config_hash
+from events import CLASSIFIED_COLUMNS
+from pipeline import as_of_status, full_event_summary, full_top_members, period_timeline, prepare_payments, uplift_engine
+
+# 📌 백그라운드 계산 스레드 수 — 환경 변수 DASHBOARD_PRECOMPUTE_WORKERS 로 조정할 수 있습니다.
+WORKERS = int(os.environ.get("DASHBOARD_PRECOMPUTE_WORKERS", "4"))
+
+# 📌 업로드 직후 미리 계산해 두는 페이지별 결과: 이름 → data 를 받아 결과를 data 에 보관하는 함수
+# (pipeline 의 함수들은 결과를 data 에 캐시하므로, 페이지는 같은 함수를 다시 호출해 바로 가져갑니다)
+TASKS = {
+    "이벤트 분류": lambda data: data["derived"].require(CLASSIFIED_COLUMNS),
+    "기간권 타임라인": period_timeline,
+    "기준일 상태": as_of_status,
+    "이벤트 현황": lambda data: (full_event_summary(data), uplift_engine(data)),
+    "회원 TOP 10": full_top_members,
+}
+
+_pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="precompute")
+_lock = threading.Lock()
+
+def data_key(file_hash, branch=ALL_BRANCHES):
+    """prepare_payments 결과의 공유 캐시 키 (업로드 파일 해시, 이벤트/가격 설정 해시, 지점)"""
+    return (file_hash, config_hash(), branch)
+
+def _data_size(shared):
+    """
+    prepare_payments 결과의 캐시 크기를 세는 함수입니다. shared(업로드 데이터셋 항목이 이미 세고 있는 프레임·큐브)는
+    이 결과도 함께 참조하므로 두 번 세지 않도록 뺍니다. (업로드 프레임은 바뀌지 않으므로 처음 한 번만 셉니다)
+    """
+    shared_nbytes = []
+
+    def size(data):
+        if not shared_nbytes:
+            shared_nbytes.append(estimate_nbytes(shared))
+        return max(estimate_nbytes(data) - shared_nbytes[0], 0)
+    return size
+
+def prepared(df, file_hash, branch_cubes=None, branch=ALL_BRANCHES, handle=None):
+    """
+    branch 지점의 prepare_payments 결과를 공유 캐시에서 가져옵니다. (없으면 계산합니다)
+    handle 이 주어지면 세션의 "data" 항목으로 참조합니다. 업로드 때 지점별로 만들어 둔 큐브가 있으면 다시 집계하지 않습니다.
+    """
+    cube = (branch_cubes or {}).get(branch)
+    compute = lambda: prepare_payments(select_branch(df, branch), cube=cube)
+    # 전체 지점이면 파생 프레임의 원본 컬럼은 업로드 프레임 그대로입니다.
+    size = _data_size([frame for frame in (df if branch == ALL_BRANCHES else None, cube) if frame is not None])
+    key = data_key(file_hash, branch)
+    if handle is not None:
+        return handle.get_or_compute("data", key, compute, size=size)
+    return shared_cache().get_or_compute(key, compute, size=size)
+
+def warm(data, key=None):
+    """
+    data 의 TASKS 를 스레드 풀에 한 번만 제출합니다. (이미 제출했으면 아무것도 하지 않습니다)
+    key(data 의 공유 캐시 키)가 주어지면 작업이 data 에 결과를 더할 때마다 캐시 크기를 다시 셉니다.
+    """
+    with _lock:
+        if "precompute" not in data:
+            data["precompute"] = {name: _pool.submit(task, data) for name, task in TASKS.items()}
+            if key is not None:
+                for future in data["precompute"].values():
+                    future.add_done_callback(lambda _: shared_cache().resize(key))
+
+def start(df, file_hash, branch_cubes=None):
+    """
+    업로드 직후 호출합니다. 전체 지점의 prepare_payments 와 TASKS 를 백그라운드에서 시작하므로,
+    사용자가 첫 페이지를 보는 동안 다른 페이지의 결과가 준비됩니다.
+    """
+    return _pool.submit(lambda: warm(prepared(df, file_hash, branch_cubes), data_key(file_hash)))
+
+def is_ready(data, name):
+    """name 결과가 준비됐는지 (백그라운드 작업이 없으면 페이지가 직접 계산하므로 True)"""
+    future = data.get("precompute", {}).get(name)
+    return future is None or future.done()
+
+def wait_for(data, name):
+    """
+    name 백그라운드 작업이 끝날 때까지 기다립니다. 작업이 실패했으면 예외를 내지 않고 돌아가며,
+    페이지가 같은 함수를 다시 호출할 때 직접 계산합니다.
+    """
+    future = data.get("precompute", {}).get(name)
+    if future is not None:
+        wait([future])
@@ -0,0 +1,102 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# 📌 기본값으로 측정을 켤지 여부 (환경 변수 DASHBOARD_PROFILE=1)
+ENABLED_BY_DEFAULT = os.environ.get("DASHBOARD_PROFILE", "") == "1"
+# 📌 측정 결과를 누적 기록하는 JSONL 파일
+LOG_PATH = os.environ.get("DASHBOARD_PROFILE_LOG", os.path.join("logs", "perf.jsonl"))
+
+# Streamlit 은 세션마다 별도 스레드에서 스크립트를 실행하므로 측정 상태(기록, 단계 스택)는 스레드별로 둡니다.
+_local = threading.local()
+
+# 📌 tracemalloc 은 프로세스 전체에 걸리고 모든 스레드의 할당을 느리게 하므로,
+# 측정 중인 가장 바깥 단계가 하나라도 실행 중일 때만 켜 둡니다. (참조 수가 0 이 되면 끕니다)
+# 최대 메모리도 프로세스 전체 값이므로, 여러 세션이 동시에 측정하면 서로의 할당이 섞여 기록됩니다.
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False
+
+def _acquire_tracing():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_owned = True
+        _tracing_users += 1
+
+def _release_tracing():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        _tracing_users -= 1
+        # 외부에서(python -X tracemalloc 등) 켠 추적은 끄지 않습니다.
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+def begin_run(enabled):
+    """이번 실행(rerun)의 측정을 시작합니다. enabled 가 False 이면 stage() 는 아무것도 기록하지 않습니다."""
+    _local.enabled = enabled
+    _local.records = []
+    _local.stack = []
+
+def is_enabled():
+    return getattr(_local, "enabled", False)
+
+def records():
+    """이번 실행에서 기록된 [{"stage", "seconds", "peak_mb"}] 목록"""
+    return list(getattr(_local, "records", []))
+
+@contextmanager
+def stage(name):
+    """
+    with stage("classify"): ... 블록의 실행 시간과 최대 메모리 증가량을 기록합니다.
+    중첩된 단계는 "바깥/안쪽" 이름으로 기록되며, 측정이 꺼져 있으면 비용이 거의 없습니다.
+    최대 메모리는 프로세스 전체 기준이므로 같은 시간에 실행된 다른 스레드의 할당도 포함될 수 있습니다.
+    """
+    if not is_enabled():
+        yield
+        return
+
+    outermost = not _local.stack
+    if outermost:
+        _acquire_tracing()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    frame = {"name": name, "start_mem": current, "max_peak": current}
+    _local.stack.append(frame)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, frame["max_peak"])
+        _local.stack.pop()
+        # 안쪽 단계가 reset_peak 로 지운 최대값을 바깥 단계에 전달합니다.
+        if _local.stack:
+            parent = _local.stack[-1]
+            parent["max_peak"] = max(parent["max_peak"], peak)
+            tracemalloc.reset_peak()
+        full_name = "/".join([f["name"] for f in _local.stack] + [name])
+        _local.records.append({
+            "stage": full_name,
+            "seconds": round(seconds, 4),
+            "peak_mb": round((peak - frame["start_mem"]) / 1024 / 1024, 2),
+        })
+        if outermost:
+            _release_tracing()
+
+def write_log(meta=None, path=None):
+    """이번 실행의 측정 결과를 한 줄(JSON)로 로그 파일에 추가합니다."""
+    if not is_enabled() or not records():
+        return
+    path = path or LOG_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    line = {"timestamp": datetime.now().isoformat(timespec="seconds"), **(meta or {}), "stages": records()}
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(line, ensure_ascii=False) + "\n")
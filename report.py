@@ -0,0 +1,101 @@
+"""
+결제 로그 파일(CSV 또는 엑셀 .xlsx)로 지점별 월별 정산 보고서를 만드는 명령행 도구입니다. (Streamlit 없이 실행됩니다)
+
+    python report.py 강남점.csv 홍대점.csv --out reports --format csv xlsx --months 2025-01 2025-02
+
+대시보드와 같은 읽기 → 이벤트 분류 → 일별 큐브 집계를 파일마다 프로세스 풀에서 동시에 처리하고,
+지점마다(여러 지점이면 "전체" 포함) 월별 정산 / 구분별 / 결제구분별 / 주문유형별 월별 합계 표를 저장합니다.
+"""
+import argparse
+import importlib.util
+import os
+import re
+import time
+
+import pandas as pd
+
+from aggregates import monthly_pivot, monthly_settlement
+from branches import ALL_BRANCHES, merge_exports, process_exports
+from ingest import sniff_header
+
+# 📌 보고서 이름 → 큐브로 표를 만드는 함수
+REPORTS = {
+    "월별 정산": monthly_settlement,
+    "구분별 월별 합계": lambda cube: monthly_pivot(cube, "구분"),
+    "결제구분별 월별 합계": lambda cube: monthly_pivot(cube, "결제구분"),
+    "주문유형별 월별 합계": lambda cube: monthly_pivot(cube, "주문유형"),
+}
+FORMATS = ["csv", "parquet", "xlsx"]
+
+def _safe_name(name):
+    """파일/폴더 이름에 쓸 수 없는 문자를 _ 로 바꿉니다."""
+    return re.sub(r'[\\/:*?"<>|]', "_", str(name)).strip() or "_"
+
+def build_reports(cube, months=None):
+    """큐브 하나(지점 하나)의 {보고서 이름: 표}. months(["2025-01", ...])가 주어지면 그 달만 집계합니다."""
+    if months:
+        cube = cube[cube["연월_str"].isin(months)]
+    return {name: build(cube) for name, build in REPORTS.items()}
+
+def write_reports(reports, out_dir, branch, formats):
+    """한 지점의 보고서를 formats 형식으로 저장하고, 저장한 파일 경로 목록을 반환합니다."""
+    written = []
+    branch_dir = os.path.join(out_dir, _safe_name(branch))
+    if "csv" in formats or "parquet" in formats:
+        os.makedirs(branch_dir, exist_ok=True)
+    for name, table in reports.items():
+        if "csv" in formats:
+            # 엑셀에서 한글이 깨지지 않도록 BOM 을 붙입니다.
+            path = os.path.join(branch_dir, f"{name}.csv")
+            table.to_csv(path, index=False, encoding="utf-8-sig")
+            written.append(path)
+        if "parquet" in formats:
+            path = os.path.join(branch_dir, f"{name}.parquet")
+            table.to_parquet(path, index=False)
+            written.append(path)
+    if "xlsx" in formats:
+        # 지점마다 한 통합 문서에 보고서를 시트로 저장합니다.
+        os.makedirs(out_dir, exist_ok=True)
+        path = os.path.join(out_dir, f"{_safe_name(branch)}.xlsx")
+        with pd.ExcelWriter(path, engine="openpyxl") as writer:
+            for name, table in reports.items():
+                table.to_excel(writer, sheet_name=name, index=False)
+        written.append(path)
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="결제 로그 CSV/xlsx → 지점별 월별 정산 보고서")
+    parser.add_argument("files", nargs="+", help="결제 로그 CSV 또는 .xlsx 파일 (여러 지점 가능)")
+    parser.add_argument("--out", default="reports", help="보고서를 저장할 폴더")
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=["csv"], dest="formats")
+    parser.add_argument("--months", nargs="+", metavar="YYYY-MM", help="이 달들만 집계 (기본: 전체 기간)")
+    args = parser.parse_args()
+
+    if "xlsx" in args.formats and importlib.util.find_spec("openpyxl") is None:
+        raise SystemExit("🚨 xlsx 보고서를 만들려면 openpyxl 이 필요합니다. (pip install openpyxl)")
+
+    start = time.perf_counter()
+    raws = []
+    encodings = []
+    for path in args.files:
+        with open(path, "rb") as f:
+            raw = f.read()
+        file_type, encoding = sniff_header(raw)
+        if file_type != "payment":
+            raise SystemExit(f"🚨 결제 로그 파일이 아닙니다: {path}")
+        raws.append(raw)
+        encodings.append(encoding)
+
+    # 📌 파일마다 읽기·지점별 분류·큐브 집계를 프로세스 풀에서 동시에 처리한 뒤 합칩니다.
+    df, cubes = merge_exports(process_exports(raws, encodings))
+    print(f"📥 {len(args.files)}개 파일, 결제완료 주문 {len(df):,}건 ({time.perf_counter() - start:.1f}초)")
+
+    # 지점이 하나뿐이면 전체 합계는 그 지점과 같으므로 지점 보고서만 저장합니다.
+    branches = [name for name in cubes if name != ALL_BRANCHES] if len(cubes) == 2 else list(cubes)
+    for branch in branches:
+        written = write_reports(build_reports(cubes[branch], args.months), args.out, branch, args.formats)
+        print(f"🏢 {branch}: {len(written)}개 파일")
+    print(f"✅ {args.out} 에 저장했습니다. ({time.perf_counter() - start:.1f}초)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import pandas as pd
+
+from events import format_dday
+
+# 📌 값의 종류가 적은 문자열 컬럼 → category
+PAYMENT_CATEGORY_COLUMNS = ["브랜드", "지점", "구분", "이름", "결제구분", "주문유형", "주문상태", "시간", "기간", "상품 유형", "이벤트명"]
+MEMBER_CATEGORY_COLUMNS = ["성별", "수신", "수신2", "상태", "이용권", "좌석타입"]
+# 📌 결제 로그 금액/번호 컬럼 → int32 (빈 값이 있으면 Int32)
+INT32_COLUMNS = ["No", "주문금액", "할인금액", "합계금액", "남은일수"]
+# 📌 결제 로그 날짜 컬럼 → datetime64
+DATETIME_COLUMNS = ["주문일시", "시작일", "종료일"]
+
+def frame_nbytes(df):
+    """DataFrame 의 실제 메모리 사용량(바이트, 문자열 포함)"""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+def _to_int32(series):
+    values = pd.to_numeric(series, errors="coerce")
+    return values.astype("int32" if values.notna().all() else "Int32")
+
+def _compact(df, category_columns, int32_columns=(), datetime_columns=()):
+    converted = {}
+    for col in category_columns:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            converted[col] = df[col].astype("category")
+    for col in int32_columns:
+        if col in df.columns and str(df[col].dtype) not in ("int32", "Int32"):
+            converted[col] = _to_int32(df[col])
+    for col in datetime_columns:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            converted[col] = pd.to_datetime(df[col], errors="coerce")
+    return df.assign(**converted) if converted else df
+
+def compact_payments(df):
+    """
+    결제 로그(분류 컬럼 포함 가능)를 작은 타입으로 바꾼 DataFrame 을 반환합니다.
+    구분/결제구분/주문유형/이름/상품 유형 등은 category, 금액은 int32, 날짜는 datetime64 로 저장합니다.
+    이미 변환된 컬럼이나 없는 컬럼은 건너뜁니다.
+    """
+    return _compact(df, PAYMENT_CATEGORY_COLUMNS, INT32_COLUMNS, DATETIME_COLUMNS)
+
+def compact_members(df):
+    """회원 데이터의 값 종류가 적은 컬럼을 category 로 바꾼 DataFrame 을 반환합니다."""
+    return _compact(df, MEMBER_CATEGORY_COLUMNS)
+
+def display_frame(df, columns):
+    """
+    화면 표시용 DataFrame 을 만듭니다. (렌더링 직전에만 포맷)
+    D-Day 는 남은일수에서 "D-3" 문자열로 만들고, 시작일/종료일은 시각 없이 날짜만 표시합니다.
+    """
+    formatted = {}
+    if "D-Day" in columns and "남은일수" in df.columns:
+        formatted["D-Day"] = format_dday(df["남은일수"])
+    for col in ["시작일", "종료일"]:
+        if col in columns and pd.api.types.is_datetime64_any_dtype(df[col]):
+            formatted[col] = df[col].dt.date
+    view = df[[col for col in columns if col in df.columns and col not in formatted]]
+    return view.assign(**formatted)[[col for col in columns if col in view.columns or col in formatted]]
@@ -0,0 +1,77 @@
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+# 📌 한글 음절(가~힣)의 초성 19자
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+CHOSEONG_SET = set(CHOSEONG)
+
+def to_choseong(text):
+    """한글 음절은 초성으로 바꾸고, 나머지 글자는 그대로 둔 문자열을 반환합니다. ("홍길동" → "ㅎㄱㄷ")"""
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        out.append(CHOSEONG[code // 588] if 0 <= code < 11172 else ch)
+    return "".join(out)
+
+def _ngrams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+def _matches(query, name):
+    """query 의 초성 글자는 name 의 같은 초성 음절과, 나머지 글자는 그대로 일치하는 부분 문자열이 있는지 확인합니다."""
+    for i in range(len(name) - len(query) + 1):
+        if all(q == c or (q in CHOSEONG_SET and to_choseong(c) == q) for q, c in zip(query, name[i:i + len(query)])):
+            return True
+    return False
+
+class NameIndex:
+    """
+    데이터셋의 이름(고유값)마다 행 위치를 모아 둔 검색 인덱스입니다.
+    이름 원문과 초성 문자열에 대한 bigram 으로 후보를 좁힌 뒤 확인하므로, 검색 비용은 주문 수가 아니라
+    고유 이름 수와 일치하는 행 수에만 비례합니다. "길동", "ㅎㄱㄷ", "홍ㄱ" 같은 부분/초성 검색을 지원합니다.
+    """
+
+    def __init__(self, names):
+        names = pd.Series(names).reset_index(drop=True)
+        self.positions = {
+            str(name): np.asarray(rows, dtype=np.int64)
+            for name, rows in names.groupby(names, sort=False, observed=True).indices.items()
+        }
+        self.names = list(self.positions)
+        self._keys = [name.casefold() for name in self.names]
+        self._chos = [to_choseong(key) for key in self._keys]
+        self._grams = defaultdict(set)
+        for i, (key, cho) in enumerate(zip(self._keys, self._chos)):
+            for n in (1, 2):
+                for gram in _ngrams(key, n) | _ngrams(cho, n):
+                    self._grams[gram].add(i)
+
+    @property
+    def nbytes(self):
+        return sum(rows.nbytes for rows in self.positions.values())
+
+    def matching_names(self, query):
+        """query 를 부분 문자열(또는 초성)로 포함하는 이름 목록"""
+        query = query.strip().casefold()
+        if not query:
+            return list(self.names)
+        use_cho = any(ch in CHOSEONG_SET for ch in query)
+        probe = to_choseong(query) if use_cho else query
+        n = 2 if len(probe) >= 2 else 1
+        candidates = None
+        for gram in _ngrams(probe, n):
+            found = self._grams.get(gram, set())
+            candidates = found if candidates is None else candidates & found
+        if not candidates:
+            return []
+        if use_cho:
+            return [self.names[i] for i in sorted(candidates) if _matches(query, self._keys[i])]
+        return [self.names[i] for i in sorted(candidates) if query in self._keys[i]]
+
+    def search(self, query):
+        """query 와 일치하는 이름의 행 위치(인덱스를 만들 때 넘긴 순서 기준, 오름차순)"""
+        names = self.matching_names(query)
+        if not names:
+            return np.array([], dtype=np.int64)
+        return np.sort(np.concatenate([self.positions[name] for name in names]))
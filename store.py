@@ -0,0 +1,124 @@
+import hashlib
+import os
+import threading
+from datetime import datetime
+
+# 📌 pandas / pyarrow / 분류 모듈은 읽기·쓰기 함수 안에서 가져옵니다.
+# 업로드 페이지 첫 화면은 has_payments 만 호출하므로 무거운 모듈을 불러오지 않습니다.
+
+# 📌 분류된 결제 로그를 누적 저장하는 로컬 저장소 (환경 변수 DASHBOARD_DATA_DIR 로 위치 변경)
+DATA_DIR = os.environ.get("DASHBOARD_DATA_DIR", "data")
+PAYMENTS_DIR = os.path.join(DATA_DIR, "payments")
+# 여러 세션이 동시에 같은 파일을 저장해도 같은 주문이 두 번 추가되지 않도록 확인·쓰기를 한 번에 하나씩 합니다.
+_append_lock = threading.Lock()
+
+def _part_files():
+    if not os.path.isdir(PAYMENTS_DIR):
+        return []
+    return sorted(name for name in os.listdir(PAYMENTS_DIR) if name.endswith(".parquet"))
+
+def _part_config(name):
+    # part-<저장시각>-<설정 해시 앞 12자리>.parquet
+    return name.rsplit("-", 1)[-1].removesuffix(".parquet")
+
+def _read_table(name, columns=None):
+    import pyarrow.parquet as pq
+
+    return pq.read_table(os.path.join(PAYMENTS_DIR, name), columns=columns, memory_map=True)
+
+def has_payments():
+    return bool(_part_files())
+
+def store_version():
+    """저장소 내용이 바뀌면 달라지는 키 (파트 파일은 한 번 쓰면 바뀌지 않으므로 파일 이름으로 충분합니다)"""
+    return hashlib.sha256("\n".join(_part_files()).encode("utf-8")).hexdigest()
+
+def order_keys(df):
+    """결제 프레임의 주문 키 (지점, No) MultiIndex"""
+    # 주문 No 는 지점마다 따로 매겨질 수 있으므로 (지점, No) 를 주문 키로 사용합니다.
+    import pandas as pd
+
+    return pd.MultiIndex.from_arrays([df["지점"].astype(str), df["No"].astype("Int64")])
+
+def stored_order_keys():
+    """저장소에 있는 주문 (지점, No) 목록"""
+    import pandas as pd
+    import pyarrow as pa
+
+    files = _part_files()
+    if not files:
+        return order_keys(pd.DataFrame({"지점": [], "No": []}))
+    keys = pa.concat_tables(
+        [_read_table(name, columns=["지점", "No"]) for name in files], promote_options="permissive"
+    ).to_pandas()
+    return order_keys(keys.dropna(subset=["No"])).unique()
+
+def _write_part(df, config):
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(PAYMENTS_DIR, exist_ok=True)
+    name = f"part-{datetime.now():%Y%m%d%H%M%S%f}-{config[:12]}.parquet"
+    # category 컬럼은 파트마다 사전(dictionary)이 달라 합칠 수 없으므로 일반 문자열로 저장합니다.
+    categories = [col for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)]
+    df = df.astype({col: "str" for col in categories})
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), os.path.join(PAYMENTS_DIR, name))
+    return name
+
+def append_payments(df):
+    """
+    결제 로그 중 저장소에 없는 (지점, No) 의 행만 분류해 새 파트 파일로 추가하고, 추가된 행 수를 반환합니다.
+    매주 겹치는 기간을 다시 내보내도 새로 생긴 주문만 처리됩니다. (이미 분류된 행은 다시 분류하지 않습니다)
+    """
+    from event_utils import config_hash
+    from events import classify_orders, CLASSIFIED_COLUMNS
+
+    keys = order_keys(df)
+    with _append_lock:
+        new_rows = df[~keys.isin(stored_order_keys()) & ~keys.duplicated()]
+        new_rows = new_rows[new_rows["No"].notna()]
+        if new_rows.empty:
+            return 0
+        if not set(CLASSIFIED_COLUMNS).issubset(new_rows.columns):
+            new_rows = new_rows.join(classify_orders(new_rows, include_as_of=False))
+        _write_part(new_rows, config_hash())
+        return len(new_rows)
+
+def _empty_payments():
+    # 저장소가 비어 있어도 canonical_payments 가 그대로 처리할 수 있도록 결제 로그·분류 컬럼을 갖춘 빈 프레임
+    import pandas as pd
+
+    from events import classify_orders
+    from ingest import payment_columns, payment_dtypes
+
+    df = pd.DataFrame({col: pd.Series(dtype=payment_dtypes[col]) for col in payment_columns})
+    df["주문일시"] = pd.Series(dtype="datetime64[ns]")
+    return df.join(classify_orders(df, include_as_of=False))
+
+def load_payments():
+    """
+    저장소 전체를 메모리 맵으로 읽어 하나의 DataFrame 으로 반환합니다. (저장소가 비어 있으면 컬럼만 있는 빈 프레임)
+    이벤트/가격 설정이 바뀐 뒤 저장된 파트는 다시 분류하고, 현재 설정으로 새로 써 둡니다.
+    """
+    import pyarrow as pa
+
+    from event_utils import config_hash
+    from events import classify_orders, CLASSIFIED_COLUMNS
+
+    current = config_hash()
+    tables = []
+    # 오래된 파트를 다시 쓰고 지우는 동안 다른 세션이 같은 파트를 다시 쓰거나 저장소에 추가하지 않도록 잠급니다.
+    with _append_lock:
+        for name in _part_files():
+            table = _read_table(name)
+            if _part_config(name) != current[:12]:
+                df = table.to_pandas().drop(columns=CLASSIFIED_COLUMNS, errors="ignore")
+                df = df.join(classify_orders(df, include_as_of=False))
+                _write_part(df, current)
+                os.remove(os.path.join(PAYMENTS_DIR, name))
+                table = pa.Table.from_pandas(df, preserve_index=False)
+            tables.append(table)
+    if not tables:
+        return _empty_payments()
+    return pa.concat_tables(tables, promote_options="permissive").to_pandas()
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+# 📌 D-Day 구간 (utils.categorize_dday 와 같은 구간)
+DDAY_GROUPS = ["0~4", "5~9", "10~14", "15~19", "20~24", "25~29", "30+"]
+DDAY_BINS = [0, 5, 10, 15, 20, 25, 30, np.inf]
+
+EXPIRED_STYLE = "background-color: pink; color: black; border-color: red"
+ACTIVE_STYLE = "background-color: #caf0f8; color: black; border-color: #caf0f8"
+
+def build_timeline(timeline_df, today, show_expired=False):
+    """
+    기간권 주문(이미 분류되어 시작일/종료일 컬럼이 있는 DataFrame)으로 st_timeline 항목을 만듭니다.
+    주문명을 다시 파싱하지 않고 컬럼 연산만으로 계산하며, 다음 값을 담은 dict 를 반환합니다.
+
+    - items: D-Day 오름차순으로 정렬된 타임라인 항목 DataFrame (만료 항목은 show_expired 일 때만 포함)
+    - groups: 회원별 최소 D-Day 오름차순으로 정렬된 그룹
+    - future_count: D-Day 가 0 이상인 기간권 수
+    - dday_hist: D-Day 구간별 기간권 수 (D-Day Group, Count, Sort Order)
+    """
+    start = pd.to_datetime(timeline_df["시작일"], errors="coerce")
+    end = pd.to_datetime(timeline_df["종료일"], errors="coerce")
+    valid = start.notna() & end.notna()
+    df = timeline_df.loc[valid, ["No", "이름"]]
+    start, end = start[valid], end[valid]
+    names = df["이름"].astype(str)
+
+    today = pd.Timestamp(today)
+    weeks = ((end - start).dt.days + 1) // 7
+    d_day_value = (end - today).dt.days
+    d_day = pd.Series("D-", index=df.index).mask(d_day_value < 0, "D+") + d_day_value.abs().astype(str)
+    expired = end < today
+
+    # 📌 D-Day 가 0 이상인 기간권 수 & 구간별 히스토그램
+    upcoming = d_day_value[d_day_value >= 0]
+    binned = pd.cut(upcoming, bins=DDAY_BINS, right=False, labels=DDAY_GROUPS).value_counts(sort=False)
+    dday_hist = binned[binned > 0].rename_axis("D-Day Group").reset_index(name="Count")
+    dday_hist["D-Day Group"] = dday_hist["D-Day Group"].astype(str)
+    dday_hist["Sort Order"] = dday_hist["D-Day Group"].map({g: i + 1 for i, g in enumerate(DDAY_GROUPS)})
+
+    # 📌 타임라인 항목 (D-Day 오름차순, 같으면 원래 순서)
+    # 주문 No 는 지점마다 따로 매겨져 여러 지점을 합치면 겹치므로, 항목 ID 는 결제 프레임의 행 라벨(index)입니다.
+    items = pd.DataFrame({
+        "id": pd.Series(df.index, index=df.index, dtype="int64"),
+        "name": names,
+        "content": names + ": " + weeks.astype(str) + "주 (" + d_day + ")",
+        "start": start.dt.strftime("%Y-%m-%d"),
+        "end": end.dt.strftime("%Y-%m-%d"),
+        "d_day_value": d_day_value,
+        "weeks": weeks,
+        "style": pd.Series(ACTIVE_STYLE, index=df.index).mask(expired, EXPIRED_STYLE),
+    })
+    if not show_expired:
+        items = items[~expired]
+    items = items.sort_values("d_day_value", kind="stable")
+
+    # 📌 회원별 최소 D-Day 순서로 그룹 ID 부여 (정렬된 항목에서 처음 등장하는 순서 = 최소 D-Day 순서)
+    users = items["name"].drop_duplicates().tolist()
+    groups = [{"id": idx, "content": name} for idx, name in enumerate(users)]
+    items["group"] = items["name"].map({name: idx for idx, name in enumerate(users)})
+
+    return {
+        "items": items,
+        "groups": groups,
+        "future_count": len(upcoming),
+        "dday_hist": dday_hist,
+    }
+
+def window_timeline(model, window_start, window_end, page=0, page_size=50):
+    """
+    build_timeline 결과 중 [window_start, window_end] 기간과 겹치는 항목만 골라,
+    그룹(회원) 순서대로 page 번째 page_size 명의 항목과 그룹만 반환합니다.
+    브라우저로 보내는 데이터 크기가 회원 이력 전체가 아니라 화면에 보이는 범위에만 비례하도록 합니다.
+
+    반환값: items(st_timeline 항목 dict 목록), groups, page(범위로 보정된 페이지), page_count
+    """
+    items = model["items"]
+    window_start, window_end = str(window_start), str(window_end)
+    visible = items[(items["end"] >= window_start) & (items["start"] <= window_end)]
+
+    group_ids = np.sort(visible["group"].unique())
+    page_count = max(-(-len(group_ids) // page_size), 1)
+    page = min(max(page, 0), page_count - 1)
+    page_groups = set(group_ids[page * page_size:(page + 1) * page_size].tolist())
+
+    return {
+        "items": visible[visible["group"].isin(page_groups)].to_dict("records"),
+        "groups": [group for group in model["groups"] if group["id"] in page_groups],
+        "page": page,
+        "page_count": page_count,
+    }
+
+def event_background_items(event_configs, window_start, window_end):
+    """[window_start, window_end] 기간과 겹치는 이벤트 기간을 타임라인 배경 항목으로 만듭니다."""
+    items = []
+    for evt_name, config in event_configs.items():
+        evt_start = config["이벤트기간"][0].date()
+        evt_end = config["이벤트기간"][1].date()
+        if evt_end < window_start or evt_start > window_end:
+            continue
+        items.append({
+            "id": f"event_{evt_name}",
+            "content": evt_name,
+            "start": evt_start.isoformat(),
+            "end": evt_end.isoformat(),
+            "type": "background",
+            "style": "background-color: rgba(144, 224, 239, 0.15);"
+        })
+    return items
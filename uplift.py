@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from event_utils import event_periods
+
+class UpliftEngine:
+    """
+    이벤트별 "이벤트가 없었다면" 정가 매출(기준 매출)을 이벤트 전후의 비이벤트 일 매출로 추정합니다.
+
+    데이터 기간의 일별 정가 매출에서 이벤트 날짜(모든 이벤트 기간의 합집합)를 가린 누적합과 비이벤트 일수 누적합을
+    한 번 만들어 두므로, 이벤트 전후 N 비이벤트일의 매출 합계/일수는 searchsorted 와 누적합 차이로 바로 구할 수 있습니다.
+    N(window_days)을 바꿔도 다시 집계하지 않고 scores 만 호출하면 됩니다.
+    """
+
+    def __init__(self, normal_df, overall_start_date, overall_end_date, configs=None):
+        self.days = pd.date_range(overall_start_date, overall_end_date, freq="D")
+        daily = (
+            normal_df.groupby(normal_df["주문일시"].dt.normalize())["합계금액"].sum()
+            .reindex(self.days, fill_value=0)
+            .to_numpy(dtype=np.float64)
+        )
+
+        # 📌 이벤트 기간을 날짜 위치 [first, last] 로 바꾸고, 차분 배열로 합집합 마스크를 만듭니다.
+        periods = event_periods(configs)
+        self.events = periods.index
+        self.duration = (pd.to_datetime(periods["종료일"]) - pd.to_datetime(periods["시작일"])).dt.days.to_numpy() + 1
+        self.first = self.days.searchsorted(pd.to_datetime(periods["시작일"]))
+        self.last = self.days.searchsorted(pd.to_datetime(periods["종료일"]), side="right") - 1
+        overlaps = self.first <= self.last
+        diff = np.zeros(len(self.days) + 1, dtype=np.int64)
+        np.add.at(diff, self.first[overlaps], 1)
+        np.add.at(diff, self.last[overlaps] + 1, -1)
+        non_event = np.cumsum(diff[:-1]) == 0
+
+        # 📌 비이벤트일 정가 매출 / 비이벤트 일수 누적합 (앞에 0 을 붙여 [i, j) 구간 합 = cum[j] - cum[i])
+        self.cum_sales = np.concatenate([[0.0], np.cumsum(np.where(non_event, daily, 0.0))])
+        self.cum_days = np.concatenate([[0], np.cumsum(non_event)])
+        self.overlaps = overlaps
+
+    def scores(self, window_days):
+        """
+        모든 이벤트의 기준 매출을 한 번에 계산합니다. 이벤트 직전 window_days 개, 직후 window_days 개의 비이벤트일을 사용하며
+        데이터 기간 끝에 닿으면 있는 날만큼만 사용합니다. 데이터 기간과 겹치지 않는 이벤트는 NaN 입니다.
+
+        Returns:
+            DataFrame (index: 이벤트명): 이벤트 일수, 이전 기준 일수, 이후 기준 일수, 일평균 기준 매출, 예상 정가 매출
+        """
+        first = np.where(self.overlaps, self.first, 0)
+        after = np.where(self.overlaps, self.last + 1, 0)
+
+        # 이벤트 전: 비이벤트 누적 일수가 (시작 시점 - N) 이 되는 위치부터 시작일 전까지
+        days_before_start = self.cum_days[first]
+        lo = self.cum_days.searchsorted(np.maximum(days_before_start - window_days, 0), side="left")
+        # 이벤트 후: 종료일 다음 날부터 비이벤트 누적 일수가 (종료 시점 + N) 이 되는 위치까지
+        days_until_end = self.cum_days[after]
+        hi = self.cum_days.searchsorted(np.minimum(days_until_end + window_days, self.cum_days[-1]), side="left")
+
+        n_before = days_before_start - self.cum_days[lo]
+        n_after = self.cum_days[hi] - days_until_end
+        sales = (self.cum_sales[first] - self.cum_sales[lo]) + (self.cum_sales[hi] - self.cum_sales[after])
+        n_total = n_before + n_after
+        per_day = np.divide(sales, n_total, out=np.full(len(sales), np.nan), where=(n_total > 0) & self.overlaps)
+
+        return pd.DataFrame({
+            "이벤트 일수": self.duration,
+            "이전 기준 일수": np.where(self.overlaps, n_before, 0),
+            "이후 기준 일수": np.where(self.overlaps, n_after, 0),
+            "일평균 기준 매출": per_day,
+            "예상 정가 매출": per_day * self.duration,
+        }, index=self.events)
@@ -1,5 +1,8 @@
 import streamlit as st
 
+import profiling
+from cache import shared_cache
+
 def init_page(title, layout="wide"):
     st.set_page_config(page_title=title, layout=layout)
     hide_menu_style = """
@@ -11,6 +14,43 @@ def init_page(title, layout="wide"):
     """
     st.markdown(hide_menu_style, unsafe_allow_html=True)
 
+def cache_handle():
+    """이 세션이 공유 캐시(shared_cache)에서 참조하는 항목들의 핸들 — 세션이 끝나면 참조가 풀립니다."""
+    if "cache_handle" not in st.session_state:
+        st.session_state["cache_handle"] = shared_cache().handle()
+    return st.session_state["cache_handle"]
+
+def reset_session(keep=()):
+    """
+    업로드 상태를 초기화합니다. keep 에 있는 키는 남겨 둡니다.
+    처리된 데이터는 공유 캐시에 남아 있으므로 같은 파일을 다시 올리면 그대로 재사용됩니다.
+    """
+    if "cache_handle" in st.session_state and "cache_handle" not in keep:
+        st.session_state["cache_handle"].release_all()
+    for key in list(st.session_state.keys()):
+        if key not in keep:
+            del st.session_state[key]
+
+def start_profiling():
+    """사이드바에 ⏱️ 성능 측정 토글을 표시하고, 이번 실행의 단계별 측정을 시작합니다."""
+    enabled = st.sidebar.toggle("⏱️ 성능 측정", value=profiling.ENABLED_BY_DEFAULT, key="profile_enabled")
+    profiling.begin_run(enabled)
+
+def render_profile_panel(page_name):
+    """이번 실행의 단계별 소요 시간/최대 메모리를 사이드바에 표시하고 로그 파일에 추가합니다."""
+    if not profiling.is_enabled():
+        return
+    summary = {}
+    for record in profiling.records():
+        row = summary.setdefault(record["stage"], {"단계": record["stage"], "횟수": 0, "시간(ms)": 0.0, "최대 메모리(MB)": 0.0})
+        row["횟수"] += 1
+        row["시간(ms)"] += record["seconds"] * 1000
+        row["최대 메모리(MB)"] = max(row["최대 메모리(MB)"], record["peak_mb"])
+    with st.sidebar.expander("⏱️ 단계별 소요 시간", expanded=False):
+        st.dataframe(list(summary.values()), hide_index=True, use_container_width=True)
+        st.caption(f"📝 {profiling.LOG_PATH} 에 기록됩니다.")
+    profiling.write_log({"page": page_name, "file_hash": st.session_state.get("file_hash")})
+
 def categorize_dday(d_day_value):
     if d_day_value < 5:
         return "0~4"